@@ -5,9 +5,21 @@ An Arcade page that quizzes users on PEP 8 and basic coding best practices.
 Users earn coins for correct answers and can unlock monsters.
 """
 
+import hashlib
 import random
-import textwrap
-from typing import Any, Dict, List, Optional, TypedDict
+from types import MappingProxyType
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    TypedDict,
+    cast,
+)
 
 import streamlit as st
 
@@ -21,16 +33,43 @@ MAX_QUESTIONS_PER_GAME: int = 10
 BASE_COIN_REWARD: int = 5
 MAX_STREAK_BONUS: int = 5
 
+# Coin reward indexed by streak; the last entry applies to any longer streak.
+COIN_REWARDS: Tuple[int, ...] = tuple(
+    BASE_COIN_REWARD + min(streak, MAX_STREAK_BONUS)
+    for streak in range(MAX_STREAK_BONUS + 1)
+)
+
 HINT_COST: int = 3
 SKIP_COST: int = 4
 FIFTY_FIFTY_COST: int = 5
 
+# Number of monster cards rendered per page of the shop catalog
+MONSTERS_PER_PAGE: int = 4
+
 BADGE_SCORE_APPRENTICE: int = 5
 BADGE_SCORE_PRO: int = 7
 BADGE_STREAK_THRESHOLD: int = 3
 
 BADGE_MONSTER_COLLECTOR: str = "✨ Monster Collector"
 
+# Earned badges are stored as a single integer bitmask in session state.
+BADGE_APPRENTICE_BIT: int = 1 << 0
+BADGE_PRO_BIT: int = 1 << 1
+BADGE_STREAK_BIT: int = 1 << 2
+BADGE_NO_HINT_BIT: int = 1 << 3
+BADGE_5050_BIT: int = 1 << 4
+BADGE_MONSTER_COLLECTOR_BIT: int = 1 << 5
+
+# Display names in the order badges are listed on the results screen.
+BADGE_NAMES: Dict[int, str] = {
+    BADGE_APPRENTICE_BIT: "🏅 PEP Apprentice",
+    BADGE_PRO_BIT: "🥇 PEP Pro",
+    BADGE_STREAK_BIT: "🔥 Streak Master (3+)",
+    BADGE_NO_HINT_BIT: "🧠 No-Hint Hero",
+    BADGE_5050_BIT: "🪓 50/50 User",
+    BADGE_MONSTER_COLLECTOR_BIT: BADGE_MONSTER_COLLECTOR,
+}
+
 
 class Question(TypedDict):
     """
@@ -43,7 +82,7 @@ class Question(TypedDict):
     id: str
     prompt: str
     code: Optional[str]
-    options: List[str]
+    options: Sequence[str]
     answer_idx: int
     explanation: str
     topic: str
@@ -71,7 +110,7 @@ class Monster(TypedDict):
 # - optional code snippet (for display)
 # - multiple-choice options with answer index
 # - an explanation and topic (used for hints)
-QUESTION_POOL: List[Question] = [
+_QUESTION_DATA: List[Question] = [
     {
         "id": "line_length",
         "prompt": "What is the recommended maximum line length in PEP 8?",
@@ -86,14 +125,12 @@ QUESTION_POOL: List[Question] = [
     {
         "id": "imports_order",
         "prompt": "Which import order is PEP 8 compliant?",
-        "code": textwrap.dedent(
-            """
-            # Option A
-            import numpy as np
-            import os
-            from my_app import utils
-            """
-        ).strip(),
+        "code": (
+            "# Option A\n"
+            "import numpy as np\n"
+            "import os\n"
+            "from my_app import utils"
+        ),
         "options": [
             "Standard library -> third-party -> local application imports",
             "Third-party -> standard library -> local application imports",
@@ -130,15 +167,13 @@ QUESTION_POOL: List[Question] = [
             "Which snippet is more PEP 8 compliant regarding whitespace "
             "around operators?"
         ),
-        "code": textwrap.dedent(
-            """
-            # Version 1
-            x=1+2*3
-
-            # Version 2
-            x = 1 + 2 * 3
-            """
-        ).strip(),
+        "code": (
+            "# Version 1\n"
+            "x=1+2*3\n"
+            "\n"
+            "# Version 2\n"
+            "x = 1 + 2 * 3"
+        ),
         "options": ["Version 1", "Version 2", "Both are equally recommended", "Neither"],
         "answer_idx": 1,
         "explanation": (
@@ -149,13 +184,11 @@ QUESTION_POOL: List[Question] = [
     {
         "id": "docstring",
         "prompt": "Where should a function docstring be placed?",
-        "code": textwrap.dedent(
-            """
-            def add(a, b):
-                # Adds two numbers
-                return a + b
-            """
-        ).strip(),
+        "code": (
+            "def add(a, b):\n"
+            "    # Adds two numbers\n"
+            "    return a + b"
+        ),
         "options": [
             "As a comment above the function",
             "As the first statement inside the function (triple quotes)",
@@ -257,15 +290,13 @@ QUESTION_POOL: List[Question] = [
     {
         "id": "spaces_after_comma",
         "prompt": "Which list formatting is more PEP 8 compliant?",
-        "code": textwrap.dedent(
-            """
-            # Version 1
-            nums = [1,2,3,4]
-
-            # Version 2
-            nums = [1, 2, 3, 4]
-            """
-        ).strip(),
+        "code": (
+            "# Version 1\n"
+            "nums = [1,2,3,4]\n"
+            "\n"
+            "# Version 2\n"
+            "nums = [1, 2, 3, 4]"
+        ),
         "options": ["Version 1", "Version 2", "Both are fine", "Neither"],
         "answer_idx": 1,
         "explanation": (
@@ -307,15 +338,13 @@ QUESTION_POOL: List[Question] = [
     {
         "id": "inline_comments",
         "prompt": "Which inline comment is more PEP 8 compliant?",
-        "code": textwrap.dedent(
-            """
-            # Version 1
-            x = x + 1 #increment x
-
-            # Version 2
-            x = x + 1  # increment x
-            """
-        ).strip(),
+        "code": (
+            "# Version 1\n"
+            "x = x + 1 #increment x\n"
+            "\n"
+            "# Version 2\n"
+            "x = x + 1  # increment x"
+        ),
         "options": ["Version 1", "Version 2", "Both are fine", "Neither"],
         "answer_idx": 1,
         "explanation": (
@@ -388,12 +417,47 @@ QUESTION_POOL: List[Question] = [
     },
 ]
 
+# The pool is static, so it is frozen into a tuple of read-only mappings.
+# This keeps the data compact and turns accidental mutation into an error.
+# Options are stored as tuples so the UI can index into them directly.
+QUESTION_POOL: Tuple[Question, ...] = tuple(
+    cast(
+        Question,
+        MappingProxyType({**question, "options": tuple(question["options"])}),
+    )
+    for question in _QUESTION_DATA
+)
+
+QUESTION_IDS: Tuple[str, ...] = tuple(question["id"] for question in QUESTION_POOL)
+POOL_SIZE: int = len(QUESTION_POOL)
+
+# Widget keys for the answer radio, one per question.
+RADIO_KEY_BY_ID: Dict[str, str] = {
+    question_id: f"radio_{question_id}" for question_id in QUESTION_IDS
+}
+
+# Incorrect option indices never change, so the 50/50 power-up can sample
+# from these precomputed tuples instead of rebuilding them on every click.
+WRONG_INDICES_BY_ID: Dict[str, Tuple[int, ...]] = {
+    question["id"]: tuple(
+        index
+        for index in range(len(question["options"]))
+        if index != question["answer_idx"]
+    )
+    for question in QUESTION_POOL
+}
+
+ALL_OPTION_INDICES_BY_ID: Dict[str, Tuple[int, ...]] = {
+    question["id"]: tuple(range(len(question["options"])))
+    for question in QUESTION_POOL
+}
+
 # -----------------------------------------------------------------------------
 # Monster shop configuration
 # -----------------------------------------------------------------------------
 # “monsters” that users can purchase with coins. They do not
 # affect gameplay logic and are purely visual.
-MONSTER_SHOP: List[Monster] = [
+_MONSTER_DATA: List[Monster] = [
     {
         "id": "pep_snek",
         "name": "PEP Snek",
@@ -430,6 +494,51 @@ MONSTER_SHOP: List[Monster] = [
     },
 ]
 
+MONSTER_SHOP: Tuple[Monster, ...] = tuple(
+    cast(Monster, MappingProxyType(monster)) for monster in _MONSTER_DATA
+)
+
+
+# -----------------------------------------------------------------------------
+# Lookup indexes
+# -----------------------------------------------------------------------------
+# Questions and monsters are indexed by identifier so lookups during each
+# rerun are constant-time instead of a scan through the pool. The indexes live
+# in the resource cache, so one copy per worker is shared by every session and
+# survives module reloads. The cache key is a fingerprint of the raw pool data:
+# editing a pool changes the fingerprint, so a reload never serves an index
+# built from stale data. The pools themselves are passed with a leading
+# underscore because Streamlit cannot hash read-only mappings.
+def _pool_fingerprint(pool: Sequence[Mapping[str, Any]]) -> str:
+    """
+    Return a stable digest of a static data pool, used as a cache key.
+    """
+    return hashlib.sha256(repr(pool).encode("utf-8")).hexdigest()
+
+
+QUESTION_POOL_VERSION: str = _pool_fingerprint(_QUESTION_DATA)
+MONSTER_SHOP_VERSION: str = _pool_fingerprint(_MONSTER_DATA)
+
+
+@st.cache_resource(show_spinner=False)
+def _question_index(
+    _pool: Tuple[Question, ...], pool_version: str
+) -> Mapping[str, Question]:
+    """
+    Build the read-only question index for the pool with ``pool_version``.
+    """
+    return MappingProxyType({question["id"]: question for question in _pool})
+
+
+@st.cache_resource(show_spinner=False)
+def _monster_index(
+    _shop: Tuple[Monster, ...], shop_version: str
+) -> Mapping[str, Monster]:
+    """
+    Build the read-only monster index for the shop with ``shop_version``.
+    """
+    return MappingProxyType({monster["id"]: monster for monster in _shop})
+
 
 def get_monster(monster_id: str) -> Optional[Monster]:
     """
@@ -448,10 +557,39 @@ def get_monster(monster_id: str) -> Optional[Monster]:
     Monster | None
         Monster entry if the identifier exists, otherwise None.
     """
-    return next(
-        (monster for monster in MONSTER_SHOP if monster["id"] == monster_id),
-        None,
-    )
+    return _monster_index(MONSTER_SHOP, MONSTER_SHOP_VERSION).get(monster_id)
+
+
+@st.cache_resource(show_spinner=False)
+def _monster_for(
+    monster_id: Optional[str], shop_version: str
+) -> Optional[Monster]:
+    """
+    Resolve the selected monster once per selection instead of every rerun.
+
+    Keyed on the shop fingerprint as well, so editing the shop and reloading
+    the module never returns an entry from the previous data.
+    """
+    return get_monster(monster_id) if monster_id else None
+
+
+@st.cache_resource
+def _load_image(path: str) -> bytes:
+    """
+    Read a monster image from disk once and reuse the bytes across reruns.
+
+    Parameters
+    ----------
+    path:
+        Path of the image file, relative to the app directory.
+
+    Returns
+    -------
+    bytes
+        Raw image content that can be passed directly to st.image().
+    """
+    with open(path, "rb") as image_file:
+        return image_file.read()
 
 
 # -----------------------------------------------------------------------------
@@ -475,14 +613,17 @@ def init_state() -> None:
         "answered": False,
         "last_correct": None,
         "used_5050": False,
-        "eliminated_options": set(),
+        "eliminated_options": 0,
         "hints_used": 0,
         "skips_used": 0,
-        "badges": set(),
-        "shop_buys": [],
+        "badges": 0,
+        "pending_5050": False,
         "show_hint": False,
         "monsters_owned": [],
         "selected_monster": None,
+        # Each session gets its own generator instead of sharing the global
+        # `random` instance with every other session.
+        "rng": random.Random(),
     }
 
     # Only set defaults if the key is missing, so we don't overwrite state
@@ -507,21 +648,20 @@ def start_new_game() -> None:
     st.session_state.answered = False
     st.session_state.last_correct = None
     st.session_state.used_5050 = False
-    st.session_state.eliminated_options = set()
+    st.session_state.eliminated_options = 0
     st.session_state.hints_used = 0
     st.session_state.skips_used = 0
-    st.session_state.badges = set()
-    st.session_state.shop_buys = []
+    st.session_state.badges = 0
+    st.session_state.pending_5050 = False
     st.session_state.show_hint = False
 
     # Limit the number of questions to the size of the pool.
-    num_questions = min(st.session_state.num_questions, len(QUESTION_POOL))
+    num_questions = min(st.session_state.num_questions, POOL_SIZE)
 
     # Randomly sample question IDs so each game feels different.
-    picked_ids = random.sample(
-        [question["id"] for question in QUESTION_POOL],
-        k=num_questions,
-    )
+    rng = st.session_state.rng
+    rng.seed()
+    picked_ids = rng.sample(QUESTION_IDS, k=num_questions)
     st.session_state.question_ids = picked_ids
 
 
@@ -548,40 +688,42 @@ def get_question_by_id(question_id: str) -> Question:
         If no question with the given identifier exists.
     """
     try:
-        return next(
-            question for question in QUESTION_POOL if question["id"] == question_id
-        )
-    except StopIteration as exc:
+        return _question_index(QUESTION_POOL, QUESTION_POOL_VERSION)[question_id]
+    except KeyError as exc:
         # Fail fast with a clear error message if the ID is invalid.
         raise KeyError(f"Unknown question id: {question_id}") from exc
 
 
+# Each rule pairs a predicate over session state with the badge bit it awards.
+BADGE_RULES: Tuple[Tuple[Callable[[Any], bool], int], ...] = (
+    (lambda state: state.score >= BADGE_SCORE_APPRENTICE, BADGE_APPRENTICE_BIT),
+    (lambda state: state.score >= BADGE_SCORE_PRO, BADGE_PRO_BIT),
+    (lambda state: state.streak >= BADGE_STREAK_THRESHOLD, BADGE_STREAK_BIT),
+    # Only award the no-hint badge if the player completed all questions.
+    (
+        lambda state: (
+            state.hints_used == 0 and state.q_index == len(state.question_ids)
+        ),
+        BADGE_NO_HINT_BIT,
+    ),
+    # Badge that shows the player tried the 50/50 power-up at least once.
+    (lambda state: state.used_5050, BADGE_5050_BIT),
+)
+
+
 def award_badges() -> None:
     """
     Award badges at the end of the quiz based on the user's performance.
 
     Badges are derived from score, streak and power-up usage and are stored
-    in session state for display in the result screen.
+    as bits in session state for display in the result screen.
     """
-    if st.session_state.score >= BADGE_SCORE_APPRENTICE:
-        st.session_state.badges.add("🏅 PEP Apprentice")
-
-    if st.session_state.score >= BADGE_SCORE_PRO:
-        st.session_state.badges.add("🥇 PEP Pro")
-
-    if st.session_state.streak >= BADGE_STREAK_THRESHOLD:
-        st.session_state.badges.add("🔥 Streak Master (3+)")
-
-    # Only award the no-hint badge if the player completed all questions.
-    if (
-        st.session_state.hints_used == 0
-        and st.session_state.q_index == len(st.session_state.question_ids)
-    ):
-        st.session_state.badges.add("🧠 No-Hint Hero")
-
-    # Badge that shows the player tried the 50/50 power-up at least once.
-    if st.session_state.used_5050:
-        st.session_state.badges.add("🪓 50/50 User")
+    state = st.session_state
+    earned = state.badges
+    for predicate, badge_bit in BADGE_RULES:
+        if predicate(state):
+            earned |= badge_bit
+    state.badges = earned
 
 
 def reset_question_powerups() -> None:
@@ -593,9 +735,70 @@ def reset_question_powerups() -> None:
     """
     st.session_state.answered = False
     st.session_state.used_5050 = False
-    st.session_state.eliminated_options = set()
+    st.session_state.eliminated_options = 0
     st.session_state.show_hint = False
-    st.session_state.shop_buys = []
+    st.session_state.pending_5050 = False
+
+
+# skip_question() is used as a button callback. Streamlit runs callbacks
+# before the script reruns, so the page renders the updated state directly
+# and no extra st.rerun() pass is needed. The Next button lives in the
+# question fragment and calls advance_question() before an app-wide rerun.
+def advance_question() -> None:
+    """
+    Move to the next question and clear the per-question power-ups.
+    """
+    st.session_state.q_index += 1
+    reset_question_powerups()
+
+
+def skip_question() -> None:
+    """
+    Pay for a skip and move on without affecting the score.
+
+    Skipping resets the streak, just like a wrong answer. Nothing happens
+    once the quiz is finished or the current question is already answered.
+    """
+    state = st.session_state
+    if state.answered or state.q_index >= len(state.question_ids):
+        return
+
+    state.coins -= SKIP_COST
+    state.skips_used += 1
+    state.last_correct = None
+    state.streak = 0
+    advance_question()
+
+
+def select_monster(monster_id: str) -> None:
+    """
+    Make an owned monster the one shown in the header card.
+
+    Parameters
+    ----------
+    monster_id:
+        Identifier of the monster.
+    """
+    st.session_state.selected_monster = monster_id
+
+
+def buy_monster(monster_id: str) -> None:
+    """
+    Buy a monster, select it, and award the collector badge.
+
+    Parameters
+    ----------
+    monster_id:
+        Identifier of the monster.
+    """
+    monster = get_monster(monster_id)
+    if monster is None:
+        return
+
+    st.session_state.coins -= monster["price"]
+    st.session_state.monsters_owned.append(monster_id)
+    st.session_state.selected_monster = monster_id
+    st.session_state.badges |= BADGE_MONSTER_COLLECTOR_BIT
 
 
 def apply_5050(question: Question) -> None:
@@ -610,23 +813,21 @@ def apply_5050(question: Question) -> None:
     question:
         Question entry containing the answer index and options.
     """
-    wrong_indices = [
-        index
-        for index in range(len(question["options"]))
-        if index != question["answer_idx"]
-    ]
+    wrong_indices = WRONG_INDICES_BY_ID[question["id"]]
 
     # Guard in case a question has fewer than three options in the future.
     num_to_eliminate = min(2, len(wrong_indices))
 
     # Randomly choose which incorrect answers to remove.
-    eliminated = set(random.sample(wrong_indices, k=num_to_eliminate))
+    eliminated = 0
+    for index in st.session_state.rng.sample(wrong_indices, k=num_to_eliminate):
+        eliminated |= 1 << index
 
     st.session_state.eliminated_options = eliminated
     st.session_state.used_5050 = True
 
 
-def get_visible_option_indices(question: Question) -> List[int]:
+def get_visible_option_indices(question: Question) -> Tuple[int, ...]:
     """
     Return the indices of options that should be displayed to the user.
 
@@ -640,17 +841,16 @@ def get_visible_option_indices(question: Question) -> List[int]:
 
     Returns
     -------
-    list[int]
-        Indices of options that are currently available for selection.
+    tuple[int, ...]
+        Original indices of the options that are currently available for
+        selection. They are used directly as the radio widget values.
     """
+    all_indices = ALL_OPTION_INDICES_BY_ID[question["id"]]
     if not st.session_state.used_5050:
-        return list(range(len(question["options"])))
+        return all_indices
 
-    return [
-        index
-        for index in range(len(question["options"]))
-        if index not in st.session_state.eliminated_options
-    ]
+    eliminated = st.session_state.eliminated_options
+    return tuple(index for index in all_indices if not (eliminated >> index) & 1)
 
 
 def coins_for_correct() -> int:
@@ -665,8 +865,224 @@ def coins_for_correct() -> int:
     int
         Number of coins earned based on a base value and the current streak.
     """
-    streak_bonus = min(st.session_state.streak, MAX_STREAK_BONUS)
-    return BASE_COIN_REWARD + streak_bonus
+    streak = st.session_state.streak
+    return COIN_REWARDS[streak] if streak < len(COIN_REWARDS) else COIN_REWARDS[-1]
+
+
+# -----------------------------------------------------------------------------
+# Monster shop user interface
+# -----------------------------------------------------------------------------
+# This section lets players spend coins on purely cosmetic monsters that are
+# shown at the top of the quiz screen.
+def _render_monster_cards(monsters: Sequence[Monster]) -> None:
+    """
+    Render monster cards in two columns with their buy/select buttons.
+
+    Buying or selecting a monster changes the header card and coin counters
+    outside the shop fragment, so those actions rerun the whole app.
+
+    Parameters
+    ----------
+    monsters:
+        Monsters to render, in display order.
+    """
+    state = st.session_state
+    monster_columns = st.columns(2)
+
+    for index, monster in enumerate(monsters):
+        column = monster_columns[index % 2]
+        with column:
+            if monster.get("image"):
+                st.image(_load_image(monster["image"]), width=140)
+            st.markdown(f"### {monster['emoji']} {monster['name']}")
+            st.write(f"Price: {monster['price']} 🪙")
+            st.caption(monster["description"])
+
+            owned = monster["id"] in state.monsters_owned
+
+            if owned:
+                # If already owned, either show that it is selected or allow selection.
+                if state.selected_monster == monster["id"]:
+                    st.button(
+                        "Selected",
+                        key=f"sel_{monster['id']}",
+                        disabled=True,
+                    )
+                elif st.button("Select", key=f"sel_{monster['id']}"):
+                    select_monster(monster["id"])
+                    st.rerun(scope="app")
+            else:
+                # If not owned, allow the user to buy the monster if they have enough coins.
+                not_enough_coins = state.coins < monster["price"]
+                button_label = "Not enough coins" if not_enough_coins else "Buy"
+                if st.button(
+                    button_label,
+                    key=f"buy_{monster['id']}",
+                    disabled=not_enough_coins,
+                ):
+                    buy_monster(monster["id"])
+                    st.rerun(scope="app")
+
+
+@st.fragment
+def render_monster_shop() -> None:
+    """
+    Render the monster shop as an independently rerunning fragment.
+
+    Owned monsters are listed in an expanded section and the remaining
+    catalog in a collapsed one. The catalog is paginated so that only one
+    page of cards (and widgets) is built per rerun.
+    """
+    state = st.session_state
+
+    st.subheader("Monster shop")
+
+    st.write(
+        "Coins can be used to unlock and select cosmetic monsters that are "
+        "displayed during the quiz."
+    )
+    st.write(f"Current coins: {state.coins} 🪙")
+
+    owned_monsters = [
+        monster
+        for monster in MONSTER_SHOP
+        if monster["id"] in state.monsters_owned
+    ]
+    available_monsters = [
+        monster
+        for monster in MONSTER_SHOP
+        if monster["id"] not in state.monsters_owned
+    ]
+
+    with st.expander(f"Owned ({len(owned_monsters)})", expanded=True):
+        if owned_monsters:
+            _render_monster_cards(owned_monsters)
+        else:
+            st.caption("No monsters owned yet.")
+
+    with st.expander(f"Available ({len(available_monsters)})", expanded=False):
+        if not available_monsters:
+            st.caption("All monsters unlocked.")
+            return
+
+        page_count = -(-len(available_monsters) // MONSTERS_PER_PAGE)
+        page = 1
+        if page_count > 1:
+            page = st.selectbox(
+                "Page",
+                range(1, page_count + 1),
+                key="monster_shop_page",
+            )
+
+        start = (page - 1) * MONSTERS_PER_PAGE
+        page_monsters = available_monsters[start : start + MONSTERS_PER_PAGE]
+        _render_monster_cards(page_monsters)
+
+
+# -----------------------------------------------------------------------------
+# Quiz question UI
+# -----------------------------------------------------------------------------
+
+@st.fragment
+def render_question() -> None:
+    """
+    Render the current question with its answer controls.
+
+    Runs as a fragment, so picking an answer only reruns this part of the
+    page. Submit and Next change coins and the power-up lock, so they
+    trigger a full app rerun. State is read here instead of being passed in,
+    because fragment reruns reuse the arguments of the last full run.
+    """
+    state = st.session_state
+    current_index = state.q_index
+    total_questions = len(state.question_ids)
+
+    # Retrieve the current question based on the stored ID order.
+    question_id = state.question_ids[current_index]
+    question = get_question_by_id(question_id)
+
+    # If the user bought 50/50 for this question, apply it once.
+    if state.pending_5050 and not state.used_5050:
+        state.pending_5050 = False
+        apply_5050(question)
+
+    # Heads-up display with basic game stats.
+    hud1, hud2, hud3, hud4 = st.columns(4)
+    hud1.metric("Question", f"{current_index + 1}/{total_questions}")
+    hud2.metric("Score", state.score)
+    hud3.metric("Coins", f"{state.coins} 🪙")
+    hud4.metric("Streak", state.streak)
+
+    st.subheader(question["prompt"])
+
+    # Optional code snippet that illustrates the question.
+    if question.get("code"):
+        st.code(question["code"], language="python")
+
+    # When a hint is activated, show the question topic.
+    if state.show_hint:
+        st.warning(f"Topic: {question['topic']}")
+
+    # Filter visible options depending on whether 50/50 was used.
+    option_indices = get_visible_option_indices(question)
+
+    # The radio values are the original option indices, so the choice
+    # can be compared to answer_idx without any remapping. We store it
+    # in Streamlit state using a unique key per question to avoid
+    # collisions across reruns.
+    chosen_idx = st.radio(
+        "Choose an answer:",
+        options=option_indices,
+        format_func=question["options"].__getitem__,
+        key=RADIO_KEY_BY_ID[question_id],
+        disabled=state.answered,
+    )
+
+    submit_col, next_col = st.columns([1, 1])
+
+    with submit_col:
+        # The Submit button locks in the current choice.
+        if st.button(
+            "Submit",
+            use_container_width=True,
+            disabled=state.answered,
+        ):
+            is_correct = chosen_idx == question["answer_idx"]
+            state.answered = True
+            state.last_correct = is_correct
+
+            if is_correct:
+                state.score += 1
+                state.streak += 1
+                coins_earned = coins_for_correct()
+                state.coins += coins_earned
+            else:
+                # Wrong answers reset the streak.
+                state.streak = 0
+
+            # Coins, the streak and the power-up lock live outside this
+            # fragment, so the whole page is refreshed.
+            st.rerun(scope="app")
+
+    with next_col:
+        # The Next button moves to the next question after submission.
+        if st.button(
+            "Next",
+            use_container_width=True,
+            disabled=not state.answered,
+        ):
+            advance_question()
+            st.rerun(scope="app")
+
+    # After submission, provide feedback and explanation.
+    if state.answered:
+        if state.last_correct:
+            st.success("Answer is correct.")
+            st.write(f"Coins earned for this question: {coins_for_correct()}")
+        else:
+            st.error("Answer is not correct.")
+
+        st.write(f"Explanation: {question['explanation']}")
 
 
 # -----------------------------------------------------------------------------
@@ -683,11 +1099,14 @@ def main() -> None:
     # Initialize all required session state variables before rendering any UI.
     init_state()
 
-    current_monster = (
-        get_monster(st.session_state.selected_monster)
-        if st.session_state.selected_monster
-        else None
-    )
+    # main() runs top to bottom on every interaction, so session state is
+    # bound to a local name once instead of being looked up repeatedly.
+    # Values that are not mutated during this pass are bound directly.
+    state = st.session_state
+    started = state.started
+
+    selected_monster = state.selected_monster
+    current_monster = _monster_for(selected_monster, MONSTER_SHOP_VERSION)
 
     # Main app title and subtitle.
     st.title("🐍 PEP Quiz Arcade")
@@ -698,7 +1117,7 @@ def main() -> None:
         top_col_img, top_col_info = st.columns([1, 3])
         with top_col_img:
             if current_monster.get("image"):
-                st.image(current_monster["image"], width=80)
+                st.image(_load_image(current_monster["image"]), width=80)
         with top_col_info:
             st.info(
                 f"Current monster: {current_monster['emoji']} "
@@ -712,89 +1131,64 @@ def main() -> None:
         st.subheader("Quiz settings")
 
         # Slider allows the user to choose how many questions the game will have.
-        st.session_state.num_questions = st.slider(
+        state.num_questions = st.slider(
             "Questions per game",
             MIN_QUESTIONS_PER_GAME,
-            min(MAX_QUESTIONS_PER_GAME, len(QUESTION_POOL)),
-            st.session_state.num_questions,
+            min(MAX_QUESTIONS_PER_GAME, POOL_SIZE),
+            state.num_questions,
         )
 
         # Button to start a new game and reset the state.
-        if st.button("New game"):
-            start_new_game()
-            st.rerun()
+        st.button("New game", on_click=start_new_game)
 
     with shop_col:
         st.subheader("Power-up shop")
-        st.write(f"Coins: {st.session_state.coins} 🪙")
+        st.write(f"Coins: {state.coins} 🪙")
 
         col_left, col_right = st.columns(2)
 
+        # Power-ups share the same lock condition (not started, answered, or
+        # finished), so evaluate it once. Coins are still read per button
+        # because an earlier purchase in this pass may already have spent them.
+        game_locked = (
+            not started
+            or state.answered
+            or state.q_index >= len(state.question_ids)
+        )
+
         with col_left:
             # Hint reveals the topic of the current question to guide the user.
-            if st.button(
-                f"Hint ({HINT_COST})",
-                disabled=(
-                    st.session_state.coins < HINT_COST
-                    or not st.session_state.started
-                    or st.session_state.answered
-                ),
-            ):
-                st.session_state.coins -= HINT_COST
-                st.session_state.hints_used += 1
-                st.session_state.shop_buys.append("Hint")
-                st.session_state.show_hint = True
+            disabled_hint = state.coins < HINT_COST or game_locked
+            if st.button(f"Hint ({HINT_COST})", disabled=disabled_hint):
+                state.coins -= HINT_COST
+                state.hints_used += 1
+                state.show_hint = True
 
             # Skip allows moving on without affecting the score, but resets the streak.
-            if st.button(
+            disabled_skip = state.coins < SKIP_COST or game_locked
+            st.button(
                 f"Skip ({SKIP_COST})",
-                disabled=(
-                    st.session_state.coins < SKIP_COST
-                    or not st.session_state.started
-                    or st.session_state.answered
-                ),
-            ):
-                st.session_state.coins -= SKIP_COST
-                st.session_state.skips_used += 1
-                st.session_state.shop_buys.append("Skip")
-                st.session_state.last_correct = None
-                st.session_state.streak = 0
-                st.session_state.answered = True
+                disabled=disabled_skip,
+                on_click=skip_question,
+            )
 
         with col_right:
             # 50/50 removes two incorrect options on the current question.
-            if st.button(
-                f"50/50 ({FIFTY_FIFTY_COST})",
-                disabled=(
-                    st.session_state.coins < FIFTY_FIFTY_COST
-                    or not st.session_state.started
-                    or st.session_state.answered
-                    or st.session_state.used_5050
-                ),
-            ):
-                st.session_state.coins -= FIFTY_FIFTY_COST
-                st.session_state.shop_buys.append("50/50")
+            disabled_5050 = (
+                state.coins < FIFTY_FIFTY_COST or game_locked or state.used_5050
+            )
+            if st.button(f"50/50 ({FIFTY_FIFTY_COST})", disabled=disabled_5050):
+                state.coins -= FIFTY_FIFTY_COST
+                state.pending_5050 = True
 
     st.markdown("---")
 
     # If the game has not started yet, prompt the user to start it.
-    if not st.session_state.started:
+    if not started:
         st.info("Start a new game using the controls above.")
     else:
-        total_questions = len(st.session_state.question_ids)
-        current_index = st.session_state.q_index
-
-        # Handle the case where the user used "Skip":
-        # we mark the question as answered with no correctness and then
-        # automatically advance to the next question.
-        if (
-            st.session_state.answered
-            and st.session_state.last_correct is None
-            and current_index < total_questions
-        ):
-            st.session_state.q_index += 1
-            reset_question_powerups()
-            st.rerun()
+        total_questions = len(state.question_ids)
+        current_index = state.q_index
 
         # If we've exhausted all questions, show the results screen.
         if current_index >= total_questions:
@@ -802,11 +1196,11 @@ def main() -> None:
             st.success("Quiz finished.")
 
             st.subheader("Results")
-            st.write(f"Score: {st.session_state.score} / {total_questions}")
-            st.write(f"Coins: {st.session_state.coins} 🪙")
-            st.write(f"Best streak: {st.session_state.streak}")
+            st.write(f"Score: {state.score} / {total_questions}")
+            st.write(f"Coins: {state.coins} 🪙")
+            st.write(f"Best streak: {state.streak}")
 
-            score_ratio = st.session_state.score / total_questions
+            score_ratio = state.score / total_questions
             if score_ratio <= 0.4:
                 st.write("Summary: Basic familiarity with PEP 8.")
             elif score_ratio <= 0.75:
@@ -814,153 +1208,29 @@ def main() -> None:
             else:
                 st.write("Summary: Very strong understanding of PEP 8.")
 
-            if st.session_state.badges:
+            if state.badges:
                 st.subheader("Badges")
-                st.write(" • " + "\n • ".join(sorted(st.session_state.badges)))
+                # BADGE_NAMES already defines the display order, so no sort
+                # is needed when rendering the results.
+                badge_names = [
+                    name
+                    for bit, name in BADGE_NAMES.items()
+                    if state.badges & bit
+                ]
+                st.write(" • " + "\n • ".join(badge_names))
 
             st.divider()
-            if st.button("Play again", use_container_width=True):
-                start_new_game()
-                st.rerun()
-        else:
-            # Retrieve the current question based on the stored ID order.
-            question_id = st.session_state.question_ids[current_index]
-            question = get_question_by_id(question_id)
-
-            # If the user bought 50/50 for this question, apply it once.
-            if "50/50" in st.session_state.shop_buys and not st.session_state.used_5050:
-                st.session_state.shop_buys.remove("50/50")
-                apply_5050(question)
-
-            # Heads-up display with basic game stats.
-            hud1, hud2, hud3, hud4 = st.columns(4)
-            hud1.metric("Question", f"{current_index + 1}/{total_questions}")
-            hud2.metric("Score", st.session_state.score)
-            hud3.metric("Coins", f"{st.session_state.coins} 🪙")
-            hud4.metric("Streak", st.session_state.streak)
-
-            st.subheader(question["prompt"])
-
-            # Optional code snippet that illustrates the question.
-            if question.get("code"):
-                st.code(question["code"], language="python")
-
-            # When a hint is activated, show the question topic.
-            if st.session_state.show_hint:
-                st.warning(f"Topic: {question['topic']}")
-
-            # Filter visible options depending on whether 50/50 was used.
-            option_indices = get_visible_option_indices(question)
-            visible_options = [question["options"][i] for i in option_indices]
-
-            # We store the selected index in Streamlit state using a unique key
-            # per question to avoid collisions across reruns.
-            selected_index = st.radio(
-                "Choose an answer:",
-                options=list(range(len(visible_options))),
-                format_func=lambda i: visible_options[i],
-                key=f"radio_{question_id}",
-                disabled=st.session_state.answered,
+            st.button(
+                "Play again",
+                use_container_width=True,
+                on_click=start_new_game,
             )
-
-            submit_col, next_col = st.columns([1, 1])
-
-            with submit_col:
-                # The Submit button locks in the current choice.
-                if st.button(
-                    "Submit",
-                    use_container_width=True,
-                    disabled=st.session_state.answered,
-                ):
-                    chosen_original_idx = option_indices[selected_index]
-                    is_correct = chosen_original_idx == question["answer_idx"]
-                    st.session_state.answered = True
-                    st.session_state.last_correct = is_correct
-
-                    if is_correct:
-                        st.session_state.score += 1
-                        st.session_state.streak += 1
-                        coins_earned = coins_for_correct()
-                        st.session_state.coins += coins_earned
-                    else:
-                        # Wrong answers reset the streak.
-                        st.session_state.streak = 0
-
-            with next_col:
-                # The Next button moves to the next question after submission.
-                if st.button(
-                    "Next",
-                    use_container_width=True,
-                    disabled=not st.session_state.answered,
-                ):
-                    st.session_state.q_index += 1
-                    reset_question_powerups()
-                    st.rerun()
-
-            # After submission, provide feedback and explanation.
-            if st.session_state.answered:
-                if st.session_state.last_correct:
-                    st.success("Answer is correct.")
-                    st.write(f"Coins earned for this question: {coins_for_correct()}")
-                else:
-                    st.error("Answer is not correct.")
-
-                st.write(f"Explanation: {question['explanation']}")
+        else:
+            render_question()
 
     st.divider()
 
-    # -----------------------------------------------------------------------------
-    # Monster shop user interface
-    # -----------------------------------------------------------------------------
-    # This section lets players spend coins on purely cosmetic monsters that are
-    # shown at the top of the quiz screen.
-    st.subheader("Monster shop")
-
-    st.write(
-        "Coins can be used to unlock and select cosmetic monsters that are "
-        "displayed during the quiz."
-    )
-    st.write(f"Current coins: {st.session_state.coins} 🪙")
-
-    monster_columns = st.columns(2)
-
-    for index, monster in enumerate(MONSTER_SHOP):
-        column = monster_columns[index % 2]
-        with column:
-            if monster.get("image"):
-                st.image(monster["image"], width=140)
-            st.markdown(f"### {monster['emoji']} {monster['name']}")
-            st.write(f"Price: {monster['price']} 🪙")
-            st.caption(monster["description"])
-
-            owned = monster["id"] in st.session_state.monsters_owned
-
-            if owned:
-                # If already owned, either show that it is selected or allow selection.
-                if st.session_state.selected_monster == monster["id"]:
-                    st.button(
-                        "Selected",
-                        key=f"sel_{monster['id']}",
-                        disabled=True,
-                    )
-                else:
-                    if st.button("Select", key=f"sel_{monster['id']}"):
-                        st.session_state.selected_monster = monster["id"]
-                        st.rerun()
-            else:
-                # If not owned, allow the user to buy the monster if they have enough coins.
-                not_enough_coins = st.session_state.coins < monster["price"]
-                button_label = "Not enough coins" if not_enough_coins else "Buy"
-                if st.button(
-                    button_label,
-                    key=f"buy_{monster['id']}",
-                    disabled=not_enough_coins,
-                ):
-                    st.session_state.coins -= monster["price"]
-                    st.session_state.monsters_owned.append(monster["id"])
-                    st.session_state.selected_monster = monster["id"]
-                    st.session_state.badges.add(BADGE_MONSTER_COLLECTOR)
-                    st.rerun()
+    render_monster_shop()
 
 
 # Execution support
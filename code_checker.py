@@ -7,12 +7,18 @@ Optionally, it also generates a refactored version of the code.
 """
 
 import json
+import re
 import textwrap
-from typing import Any, Dict, List, Optional, Tuple
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from queue import Empty, Queue
+from threading import Event, Semaphore
+from typing import Any, Dict, FrozenSet, Iterator, List, Optional, Tuple, Union
 
-import pandas as pd
+import httpx
 import streamlit as st
 from openai import OpenAI
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
 # =============================================================================
 # Configuration
@@ -28,10 +34,67 @@ OPENAI_API_KEY: str = "PLACEHOLDER -> PLEASE EXCHANGE WITH THE CODE FROM THE MES
 MODEL_NAME_ANALYSIS: str = "gpt-5.2"
 MODEL_NAME_REFACTOR: str = "gpt-5-nano"
 
+# How long (in seconds) identical requests are served from the response cache
+RESPONSE_CACHE_TTL_SECONDS: int = 3600
 
-def get_client():
+# Retries for transient API failures (rate limits, timeouts, 5xx responses)
+MAX_API_RETRIES: int = 4
+
+# Refactoring is skipped for code that already scores at least this much
+REFACTOR_SKIP_SCORE: int = 90
+
+# Upper bound on the code sent to the model. Tokens are estimated from the
+# character count (about four characters per token for code and English).
+MAX_INPUT_TOKENS: int = 6000
+CHARS_PER_TOKEN: int = 4
+
+# Maximum number of API requests in flight at once, across all sessions.
+# Throttling up front keeps bursts (e.g. a whole classroom clicking "Analyze")
+# below the rate limit instead of relying on retries after 429 responses.
+MAX_CONCURRENT_REQUESTS: int = 5
+
+# HTTP settings for the shared client (analysis and refactor run concurrently).
+# Reasoning models can take minutes before the first token, so reads get a
+# long timeout; a cut-off request would otherwise be re-sent and re-billed.
+API_TIMEOUT_SECONDS: float = 60.0
+API_CONNECT_TIMEOUT_SECONDS: float = 10.0
+API_READ_TIMEOUT_SECONDS: float = 300.0
+
+# Longest wait for the next refactor chunk before the stream is given up on
+REFACTOR_IDLE_TIMEOUT_SECONDS: float = (
+    API_CONNECT_TIMEOUT_SECONDS + API_READ_TIMEOUT_SECONDS
+)
+MAX_KEEPALIVE_CONNECTIONS: int = 20
+
+
+@st.cache_resource
+def _create_client() -> OpenAI:
+    """
+    Create the OpenAI client that is shared by all sessions and reruns.
+
+    Reusing one client keeps its connection pool (and the TLS connections in
+    it) alive between requests. No per-user state may be stored on it.
+    Transient failures (rate limits, timeouts, 5xx responses) are retried by
+    the client itself.
+    """
+    http_client = httpx.Client(
+        timeout=httpx.Timeout(
+            API_TIMEOUT_SECONDS,
+            connect=API_CONNECT_TIMEOUT_SECONDS,
+            read=API_READ_TIMEOUT_SECONDS,
+        ),
+        limits=httpx.Limits(max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS),
+    )
+    return OpenAI(
+        api_key=OPENAI_API_KEY,
+        http_client=http_client,
+        max_retries=MAX_API_RETRIES,
+    )
+
+
+def get_client() -> Optional[OpenAI]:
     """
-    Create an OpenAI client instance if an API key is configured
+    Return the shared OpenAI client instance if an API key is configured
 
     Returns
     -------
@@ -44,13 +107,233 @@ def get_client():
         )
         return None
 
-    return OpenAI(api_key=OPENAI_API_KEY)
+    return _create_client()
 
 
 # =============================================================================
 # Prompt design
 # =============================================================================
 
+# Prompt templates are dedented once at import time; each request only fills
+# in the placeholders with str.format(). The JSON structure itself is not
+# described in the prompt; it is enforced through structured outputs below.
+_ANALYSIS_SYSTEM_TEMPLATE: str = textwrap.dedent(
+    """
+    You are an experienced software engineer and code-quality reviewer.
+    Your job is to evaluate a code snippet and produce a helpful, encouraging review.
+
+    Persona: {persona}
+    Review level: {review_level}
+    All text language: {explanation_language}
+    Code language hint: "{language_hint}" (may be "Auto"; infer from the snippet if needed)
+
+    IMPORTANT OUTPUT RULES
+    1) Respond with ONLY valid JSON. No markdown. No extra text.
+    2) JSON must match the response schema exactly (keys and types).
+    3) All scores must be integers.
+
+    GOAL AND TONE
+    - Be constructive and friendly.
+    - Be lenient with small mistakes and minor style issues.
+    - Give credit where credit is due.
+    - Reserve low scores for real problems that materially harm correctness, clarity, maintainability, or safety.
+
+    DIMENSIONS TO SCORE (0–10, integers only)
+    - readability
+    - naming
+    - structure
+    - comments
+    - robustness
+    - testability
+    - performance
+    - security
+
+    ANCHORS (use consistently)
+    - 0–2  very poor: broken, unsafe, or extremely difficult to understand/maintain
+    - 3–4  poor: major issues that significantly hinder use or safety
+    - 5–6  adequate: workable but with clear, meaningful weaknesses
+    - 7–8  good: solid quality with only minor issues
+    - 9–10 excellent: clean, idiomatic, robust, and well-structured
+
+    LENIENCY CALIBRATION
+    - Typical reasonable code should often land around 6–8 per dimension.
+    - Scores below 5 should be uncommon and must be justified by concrete issues.
+    - Do not penalize for missing “enterprise” practices unless their absence creates real risk.
+
+    REVIEW LEVEL HANDLING (THIS MUST CREATE REAL DIFFERENCES)
+    Step 1: Always evaluate the code using ONE baseline standard called "intermediate".
+            This means your dimension scores and dimension comments are always written as if the reviewer is intermediate.
+            Do NOT change dimension scores based on level.
+
+    Step 2: Compute a BASE overall_score from the dimension scores:
+            - base_overall = round(average_dimension_score * 10)
+            - Clamp base_overall to 0..100
+            - Keep in mind, code from an average university student receives around 70 points
+
+    Step 3: Apply a fixed adjustment to overall_score based on review_level:
+            - If review_level is beginner-friendly: overall_score = base_overall + 20
+            - If review_level is intermediate: overall_score = base_overall
+            - If review_level is senior or very strict: overall_score = base_overall - 20
+            - Clamp overall_score to 0..100
+
+    Mapping rules:
+    - Map any unknown label to the closest of: beginner-friendly, intermediate, senior or very strict.
+
+    WHAT TO RETURN
+    - summary.short_overview: 2–4 sentences
+    - summary.key_strengths: 3–5 strings
+    - summary.key_issues: 3–5 strings
+    - summary.top_recommendation: one sentence
+
+    learning_tips:
+    - Provide 2–3 items.
+    - Each must include title, description, bad_example, better_example.
+    - Tailor the wording complexity to the review level:
+      beginner-friendly uses simpler language, senior or very strict uses more professional wording.
+      Do not change scores for this, only the phrasing and emphasis.
+
+    Final validation checklist before you respond
+    - Valid JSON only, parseable by json.loads
+    - All text is in {explanation_language}
+    - Dimension scores are integers and reflect the intermediate baseline
+    - overall_score equals base_overall plus the fixed level adjustment (+20/0/-20), clamped to 0..100
+    """
+).strip()
+
+_ANALYSIS_USER_TEMPLATE: str = (
+    "Review the following code snippet. Provide your response strictly as JSON:"
+    "\n\n{code}"
+)
+
+# Appended to the analysis system prompt when several snippets are reviewed
+# in one request, so the long instructions are only sent (and billed) once.
+_BATCH_ANALYSIS_INSTRUCTIONS: str = textwrap.dedent(
+    """
+    BATCH MODE
+    The user message is a JSON array of objects with the keys "id" and "code".
+    Review every snippet independently, following all rules above.
+    Return a single JSON object of the form {"reviews": [...]}, with one review
+    per snippet. Each review has an integer "id" key equal to the id of its
+    snippet.
+    """
+).strip()
+
+# JSON schemas for structured outputs. In strict mode the API guarantees that
+# responses conform, so every object lists all of its keys as required and
+# forbids additional ones.
+DIMENSION_NAMES: Tuple[str, ...] = (
+    "readability",
+    "naming",
+    "structure",
+    "comments",
+    "robustness",
+    "testability",
+    "performance",
+    "security",
+)
+
+
+def _object_schema(properties: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build a strict JSON schema object in which every property is required.
+    """
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": list(properties),
+        "additionalProperties": False,
+    }
+
+
+_STRING_LIST_SCHEMA: Dict[str, Any] = {"type": "array", "items": {"type": "string"}}
+
+_REVIEW_PROPERTIES: Dict[str, Any] = {
+    "language": {
+        "type": "string",
+        "description": "Best guess of the language, e.g. 'python' or 'java'.",
+    },
+    "overall_score": {"type": "integer"},
+    "summary": _object_schema(
+        {
+            "short_overview": {"type": "string"},
+            "key_strengths": _STRING_LIST_SCHEMA,
+            "key_issues": _STRING_LIST_SCHEMA,
+            "top_recommendation": {"type": "string"},
+        }
+    ),
+    "dimensions": _object_schema(
+        {
+            name: _object_schema(
+                {"score": {"type": "integer"}, "comment": {"type": "string"}}
+            )
+            for name in DIMENSION_NAMES
+        }
+    ),
+    "learning_tips": {
+        "type": "array",
+        "items": _object_schema(
+            {
+                "title": {"type": "string"},
+                "description": {"type": "string"},
+                "bad_example": {"type": "string", "description": "Code example."},
+                "better_example": {"type": "string", "description": "Code example."},
+            }
+        ),
+    },
+}
+
+_REVIEW_SCHEMA: Dict[str, Any] = _object_schema(_REVIEW_PROPERTIES)
+
+_BATCH_REVIEW_SCHEMA: Dict[str, Any] = _object_schema(
+    {
+        "reviews": {
+            "type": "array",
+            "items": _object_schema({"id": {"type": "integer"}, **_REVIEW_PROPERTIES}),
+        }
+    }
+)
+
+
+def _json_schema_format(name: str, schema: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build a strict structured-output response_format for the given schema.
+    """
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": name, "strict": True, "schema": schema},
+    }
+
+
+# Line that separates snippets in batch mode
+BATCH_SEPARATOR: str = "---"
+
+_REFACTOR_SYSTEM_TEMPLATE: str = textwrap.dedent(
+    """
+    You are a senior software engineer.
+    Your task is to rewrite the user's code to improve code quality
+    while preserving behavior.
+
+    Perspective / persona: {persona}
+    Strictness level: {review_level}
+
+    Requirements:
+    - Keep the same programming language (detected: "{detected_language}", adjust only if obviously wrong).
+    - Improve readability, naming, structure, comments, robustness, and testability as appropriate.
+    - Do NOT change external behavior or public interfaces unless strictly necessary.
+    - Prefer small, clear functions and meaningful names.
+    - Add minimal but helpful comments / docstrings, not excessive noise.
+    - Do not invent new functionality.
+
+    OUTPUT FORMAT:
+    - Return ONLY the improved code.
+    - Do NOT include explanations, markdown, or commentary outside the code itself.
+    """
+)
+
+_REFACTOR_USER_TEMPLATE: str = (
+    "Please refactor the following code:\n\n```code\n{code}\n```"
+)
+
 
 def build_analysis_messages(
     code: str,
@@ -66,126 +349,14 @@ def build_analysis_messages(
     then applies a fixed overall_score adjustment of +20 or -20 depending on
     the selected review level.
     """
-    system_prompt = textwrap.dedent(
-        f"""
-        You are an experienced software engineer and code-quality reviewer.
-        Your job is to evaluate a code snippet and produce a helpful, encouraging review.
-
-        Persona: {persona}
-        Review level: {review_level}
-        All text language: {explanation_language}
-        Code language hint: "{language_hint}" (may be "Auto"; infer from the snippet if needed)
-
-        IMPORTANT OUTPUT RULES
-        1) Respond with ONLY valid JSON. No markdown. No extra text.
-        2) JSON must match the schema exactly (keys and types).
-        3) All scores must be integers.
-
-        GOAL AND TONE
-        - Be constructive and friendly.
-        - Be lenient with small mistakes and minor style issues.
-        - Give credit where credit is due.
-        - Reserve low scores for real problems that materially harm correctness, clarity, maintainability, or safety.
-
-        DIMENSIONS TO SCORE (0–10, integers only)
-        - readability
-        - naming
-        - structure
-        - comments
-        - robustness
-        - testability
-        - performance
-        - security
-
-        ANCHORS (use consistently)
-        - 0–2  very poor: broken, unsafe, or extremely difficult to understand/maintain
-        - 3–4  poor: major issues that significantly hinder use or safety
-        - 5–6  adequate: workable but with clear, meaningful weaknesses
-        - 7–8  good: solid quality with only minor issues
-        - 9–10 excellent: clean, idiomatic, robust, and well-structured
-
-        LENIENCY CALIBRATION
-        - Typical reasonable code should often land around 6–8 per dimension.
-        - Scores below 5 should be uncommon and must be justified by concrete issues.
-        - Do not penalize for missing “enterprise” practices unless their absence creates real risk.
-
-        REVIEW LEVEL HANDLING (THIS MUST CREATE REAL DIFFERENCES)
-        Step 1: Always evaluate the code using ONE baseline standard called "intermediate".
-                This means your dimension scores and dimension comments are always written as if the reviewer is intermediate.
-                Do NOT change dimension scores based on level.
-
-        Step 2: Compute a BASE overall_score from the dimension scores:
-                - base_overall = round(average_dimension_score * 10)
-                - Clamp base_overall to 0..100
-                - Keep in mind, code from an average university student receives around 70 points
-
-        Step 3: Apply a fixed adjustment to overall_score based on review_level:
-                - If review_level is beginner-friendly: overall_score = base_overall + 20
-                - If review_level is intermediate: overall_score = base_overall
-                - If review_level is senior or very strict: overall_score = base_overall - 20
-                - Clamp overall_score to 0..100
-
-        Mapping rules:
-        - Map any unknown label to the closest of: beginner-friendly, intermediate, senior or very strict.
-
-        WHAT TO RETURN
-        - summary.short_overview: 2–4 sentences
-        - summary.key_strengths: 3–5 strings
-        - summary.key_issues: 3–5 strings
-        - summary.top_recommendation: one sentence
-
-        learning_tips:
-        - Provide 2–3 items.
-        - Each must include title, description, bad_example, better_example.
-        - Tailor the wording complexity to the review level:
-          beginner-friendly uses simpler language, senior or very strict uses more professional wording.
-          Do not change scores for this, only the phrasing and emphasis.
-
-        JSON SCHEMA (keys and types must match exactly)
-        {{
-          "language": "string (your best guess, e.g. 'python', 'java')",
-          "overall_score": 0,
-          "summary": {{
-            "short_overview": "string",
-            "key_strengths": ["string", "..."],
-            "key_issues": ["string", "..."],
-            "top_recommendation": "string"
-          }},
-          "dimensions": {{
-            "readability": {{ "score": 0, "comment": "string" }},
-            "naming": {{ "score": 0, "comment": "string" }},
-            "structure": {{ "score": 0, "comment": "string" }},
-            "comments": {{ "score": 0, "comment": "string" }},
-            "robustness": {{ "score": 0, "comment": "string" }},
-            "testability": {{ "score": 0, "comment": "string" }},
-            "performance": {{ "score": 0, "comment": "string" }},
-            "security": {{ "score": 0, "comment": "string" }}
-          }},
-          "learning_tips": [
-            {{
-              "title": "string",
-              "description": "string",
-              "bad_example": "string with code",
-              "better_example": "string with code"
-            }}
-          ]
-        }}
-
-        Final validation checklist before you respond
-        - Valid JSON only, parseable by json.loads
-        - All text is in {explanation_language}
-        - Dimension scores are integers and reflect the intermediate baseline
-        - overall_score equals base_overall plus the fixed level adjustment (+20/0/-20), clamped to 0..100
-        """
-    ).strip()
-
-    user_prompt = textwrap.dedent(
-        f"""
-        Review the following code snippet. Provide your response strictly as JSON:
-
-        {code}
-        """
-    ).strip()
+    system_prompt = _ANALYSIS_SYSTEM_TEMPLATE.format(
+        persona=persona,
+        review_level=review_level,
+        explanation_language=explanation_language,
+        language_hint=language_hint,
+    )
+
+    user_prompt = _ANALYSIS_USER_TEMPLATE.format(code=code)
 
     return [
         {"role": "system", "content": system_prompt},
@@ -193,6 +364,92 @@ def build_analysis_messages(
     ]
 
 
+def build_batch_analysis_messages(
+    codes: List[str],
+    language_hint: str,
+    review_level: str,
+    persona: str,
+    explanation_language: str,
+) -> List[Dict[str, str]]:
+    """
+    Build the messages for reviewing several snippets in a single request.
+
+    The system prompt is the regular analysis prompt plus batch instructions;
+    the user message lists the snippets as a JSON array keyed by id.
+    """
+    system_prompt = _ANALYSIS_SYSTEM_TEMPLATE.format(
+        persona=persona,
+        review_level=review_level,
+        explanation_language=explanation_language,
+        language_hint=language_hint,
+    )
+    system_prompt = f"{system_prompt}\n\n{_BATCH_ANALYSIS_INSTRUCTIONS}"
+
+    user_prompt = json.dumps(
+        [{"id": index, "code": code} for index, code in enumerate(codes)]
+    )
+
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
+
+
+_BLANK_LINE_RUN_PATTERN = re.compile(r"\n{3,}")
+
+
+def normalize_whitespace(code: str) -> str:
+    """
+    Drop whitespace that costs input tokens without informing the review.
+
+    Trailing whitespace is stripped, tabs are expanded to 4 spaces and runs
+    of blank lines are collapsed into a single blank line.
+    """
+    lines = [line.rstrip().expandtabs(4) for line in code.splitlines()]
+    return _BLANK_LINE_RUN_PATTERN.sub("\n\n", "\n".join(lines))
+
+
+def truncate_code(code: str, max_tokens: int = MAX_INPUT_TOKENS) -> Tuple[str, bool]:
+    """
+    Clip code to an estimated token budget to bound request latency and cost.
+
+    The cut is made at the last line break inside the budget so that no
+    partial line is sent.
+
+    Returns
+    -------
+    Tuple[str, bool]
+        (possibly shortened code, whether it was truncated)
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(code) <= max_chars:
+        return code, False
+
+    clipped = code[:max_chars]
+    last_newline = clipped.rfind("\n")
+    if last_newline > 0:
+        clipped = clipped[:last_newline]
+    return clipped, True
+
+
+def split_snippets(code: str) -> List[str]:
+    """
+    Split batch input into snippets at lines that only contain BATCH_SEPARATOR.
+
+    Empty snippets (e.g. from a leading or trailing separator) are dropped.
+    """
+    snippets: List[str] = []
+    current: List[str] = []
+    for line in code.splitlines():
+        if line.strip() == BATCH_SEPARATOR:
+            snippets.append("\n".join(current))
+            current = []
+        else:
+            current.append(line)
+    snippets.append("\n".join(current))
+    return [snippet for snippet in snippets if snippet.strip()]
+
+
 def build_refactor_messages(
     code: str,
     detected_language: str,
@@ -205,30 +462,13 @@ def build_refactor_messages(
     The system prompt explains how the model should improve the code
     without changing its external behavior.
     """
-    system_prompt = textwrap.dedent(
-        f"""
-        You are a senior software engineer.
-        Your task is to rewrite the user's code to improve code quality
-        while preserving behavior.
-
-        Perspective / persona: {persona}
-        Strictness level: {review_level}
-
-        Requirements:
-        - Keep the same programming language (detected: "{detected_language}", adjust only if obviously wrong).
-        - Improve readability, naming, structure, comments, robustness, and testability as appropriate.
-        - Do NOT change external behavior or public interfaces unless strictly necessary.
-        - Prefer small, clear functions and meaningful names.
-        - Add minimal but helpful comments / docstrings, not excessive noise.
-        - Do not invent new functionality.
-
-        OUTPUT FORMAT:
-        - Return ONLY the improved code.
-        - Do NOT include explanations, markdown, or commentary outside the code itself.
-        """
+    system_prompt = _REFACTOR_SYSTEM_TEMPLATE.format(
+        persona=persona,
+        review_level=review_level,
+        detected_language=detected_language,
     )
 
-    user_prompt = f"Please refactor the following code:\n\n```code\n{code}\n```"
+    user_prompt = _REFACTOR_USER_TEMPLATE.format(code=code)
 
     return [
         {"role": "system", "content": system_prompt},
@@ -240,19 +480,103 @@ def build_refactor_messages(
 # OpenAI wrapper functions
 # =============================================================================
 
-def run_analysis(
-    client: OpenAI,
+@st.cache_resource
+def _request_slots() -> Semaphore:
+    """
+    Return the semaphore that limits concurrent API requests for all sessions.
+    """
+    return Semaphore(MAX_CONCURRENT_REQUESTS)
+
+
+def _call_chat(client: OpenAI, **request: Any) -> str:
+    """
+    Send a streamed chat completion request and return the full message text.
+
+    The OpenAI client retries rate limits, connection errors, timeouts and
+    server errors with exponential backoff and jitter, so a single transient
+    failure does not force the user to click "Analyze" again. Streamed
+    deltas are collected in a list and joined once at the end. Requests wait
+    for a free slot so that at most MAX_CONCURRENT_REQUESTS run at once.
+    """
+    with _request_slots():
+        stream = client.chat.completions.create(stream=True, **request)
+        chunks: List[str] = []
+        for event in stream:
+            if event.choices:
+                chunks.append(event.choices[0].delta.content or "")
+    return "".join(chunks)
+
+
+_TRAILING_COMMA_PATTERN = re.compile(r",\s*([}\]])")
+
+
+def parse_model_json(content: str) -> Tuple[Dict[str, Any], bool]:
+    """
+    Parse a JSON object returned by the model, tolerating small slips.
+
+    The strict standard-library parser handles the usual well-formed case at
+    full speed. Only when it fails is the text repaired: anything around the
+    outermost object (such as Markdown code fences) and trailing commas are
+    removed before parsing again.
+
+    Returns
+    -------
+    Tuple[Dict[str, Any], bool]
+        (parsed object, whether the repair fallback was needed)
+
+    Raises
+    ------
+    json.JSONDecodeError
+        If the content cannot be parsed even after the repair step.
+    """
+    try:
+        return json.loads(content), False
+    except json.JSONDecodeError as error:
+        start = content.find("{")
+        end = content.rfind("}")
+        if start == -1 or end < start:
+            raise error
+
+        repaired = _TRAILING_COMMA_PATTERN.sub(r"\1", content[start : end + 1])
+        return json.loads(repaired), True
+
+
+def _parse_model_object(content: str) -> Tuple[Dict[str, Any], bool]:
+    """
+    Parse the model output and check that it is a JSON object.
+
+    Raises
+    ------
+    ValueError
+        If the content is not valid JSON (``json.JSONDecodeError``) or does
+        not contain an object at the top level.
+    """
+    parsed, repaired = parse_model_json(content)
+    if not isinstance(parsed, dict):
+        raise ValueError(f"expected a JSON object, got {type(parsed).__name__}")
+    return parsed, repaired
+
+
+# The cached helpers below are keyed on the code and review settings only.
+# The client argument starts with an underscore so Streamlit does not hash it.
+# They parse the response before returning and raise on API failure or
+# malformed output, so neither errors nor bad responses are ever cached.
+@st.cache_data(show_spinner=False, ttl=RESPONSE_CACHE_TTL_SECONDS)
+def _fetch_analysis(
+    _client: OpenAI,
     code: str,
     language_hint: str,
     review_level: str,
     persona: str,
     explanation_language: str,
-) -> Dict[str, Any]:
+) -> Tuple[Dict[str, Any], bool]:
     """
-    Send the analysis request to the OpenAI API and return the parsed JSON.
+    Request the analysis from the OpenAI API and return the parsed JSON.
 
-    On error, an empty dictionary is returned and an error message is shown
-    in the Streamlit interface.
+    Returns
+    -------
+    Tuple[Dict[str, Any], bool]
+        (parsed analysis, whether the JSON repair fallback was needed)
     """
     messages = build_analysis_messages(
         code=code,
@@ -261,32 +585,63 @@ def run_analysis(
         persona=persona,
         explanation_language=explanation_language,
     )
+    content = _call_chat(
+        _client,
+        model=MODEL_NAME_ANALYSIS,
+        messages=messages,
+        response_format=_json_schema_format("review", _REVIEW_SCHEMA),
+    )
+    return _parse_model_object(content)
 
-    try:
-        completion = client.chat.completions.create(
-            model=MODEL_NAME_ANALYSIS,
-            messages=messages,
-            response_format={"type": "json_object"},
-        )
-        content = completion.choices[0].message.content
-        return json.loads(content)
-    except Exception as error:  # noqa: BLE001
-        st.error(f"Error during analysis: {error}")
-        return {}
 
+@st.cache_data(show_spinner=False, ttl=RESPONSE_CACHE_TTL_SECONDS)
+def _fetch_batch_analysis(
+    _client: OpenAI,
+    codes: Tuple[str, ...],
+    language_hint: str,
+    review_level: str,
+    persona: str,
+    explanation_language: str,
+) -> Tuple[Dict[str, Any], bool]:
+    """
+    Request reviews for several snippets at once and return the parsed JSON.
 
-def run_refactor(
+    Returns
+    -------
+    Tuple[Dict[str, Any], bool]
+        (parsed batch response, whether the JSON repair fallback was needed)
+    """
+    messages = build_batch_analysis_messages(
+        codes=list(codes),
+        language_hint=language_hint,
+        review_level=review_level,
+        persona=persona,
+        explanation_language=explanation_language,
+    )
+    content = _call_chat(
+        _client,
+        model=MODEL_NAME_ANALYSIS,
+        messages=messages,
+        response_format=_json_schema_format("batch_review", _BATCH_REVIEW_SCHEMA),
+    )
+    return _parse_model_object(content)
+
+
+def stream_refactor(
     client: OpenAI,
     code: str,
     detected_language: str,
     review_level: str,
     persona: str,
-) -> str:
+    cancel: Event,
+) -> Iterator[str]:
     """
-    Send the refactoring request to the OpenAI API and return the new code.
+    Stream the refactored code from the OpenAI API chunk by chunk.
 
-    On error, an empty string is returned and an error message is shown
-    in the Streamlit interface.
+    Streamed output cannot be stored in the response cache, so every call
+    sends a new request. Once ``cancel`` is set, the stream is closed after
+    the next chunk, which stops the generation on the server side. No
+    request is sent if ``cancel`` is already set when a slot frees up.
     """
     messages = build_refactor_messages(
         code=code,
@@ -294,224 +649,257 @@ def run_refactor(
         review_level=review_level,
         persona=persona,
     )
-
-    try:
-        completion = client.chat.completions.create(
+    with _request_slots():
+        if cancel.is_set():
+            return
+        stream = client.chat.completions.create(
             model=MODEL_NAME_REFACTOR,
             messages=messages,
+            stream=True,
         )
-        return completion.choices[0].message.content
-    except Exception as error:  # noqa: BLE001
-        st.error(f"Error during refactoring: {error}")
-        return ""
-
+        try:
+            for event in stream:
+                if cancel.is_set():
+                    break
+                if event.choices and event.choices[0].delta.content:
+                    yield event.choices[0].delta.content
+        finally:
+            stream.close()
 
-# =============================================================================
-# Scoring helpers for UI (traffic light)
-# =============================================================================
 
-def get_quality_level(score: int) -> Tuple[str, str, str]:
+def run_analysis(
+    client: OpenAI,
+    code: str,
+    language_hint: str,
+    review_level: str,
+    persona: str,
+    explanation_language: str,
+) -> Dict[str, Any]:
     """
-    Map an overall score (0–100) to a label and a color for the traffic light.
+    Send the analysis request to the OpenAI API and return the parsed JSON.
 
-    Returns
-    -------
-    Tuple[str, str, str]
-        (label, description, hex_color)
+    Identical requests are answered from the response cache. On error, an
+    empty dictionary is returned and an error message is shown in the
+    Streamlit interface.
     """
-    if score < 40:
-        return (
-            "Poor",
-            "Code quality is poor. Serious refactoring is strongly recommended "
-            "before using this code in production or teaching.",
-            "#c0392b",
-        )
-    if score < 60:
-        return (
-            "Below average",
-            "Code is usable but has significant weaknesses. It should be improved "
-            "to meet common best practices.",
-            "#e67e22",
-        )
-    if score < 80:
-        return (
-            "Acceptable",
-            "Code quality is acceptable. It follows some best practices, but there "
-            "is still clear potential for improvement.",
-            "#f1c40f",
-        )
-    if score < 90:
-        return (
-            "Good",
-            "Code quality is good. It follows most relevant best practices with "
-            "only minor improvement opportunities.",
-            "#27ae60",
+    # Malformed output surfaces as ValueError (JSONDecodeError is a subclass),
+    # so it is reported separately from API failures.
+    try:
+        analysis, repaired = _fetch_analysis(
+            client,
+            code=code,
+            language_hint=language_hint,
+            review_level=review_level,
+            persona=persona,
+            explanation_language=explanation_language,
         )
-    return (
-        "Excellent",
-        "Code quality is excellent. It is clear, well-structured, robust and "
-        "close to what an experienced engineer would write.",
-        "#2ecc71",
-    )
+    except ValueError as error:
+        st.error(f"The analysis response was not valid JSON: {error}")
+        return {}
+    except Exception as error:  # noqa: BLE001
+        st.error(f"Error during analysis: {error}")
+        return {}
 
+    if repaired:
+        st.toast("The analysis response needed minor JSON repairs.")
+    return analysis
 
-# =============================================================================
-# Streamlit UI
-# =============================================================================
 
-def main() -> None:
-    """
-    Render the Code Quality Checker page.
+def run_batch_analysis(
+    client: OpenAI,
+    codes: List[str],
+    language_hint: str,
+    review_level: str,
+    persona: str,
+    explanation_language: str,
+) -> List[Dict[str, Any]]:
     """
-    st.title("🔍 Code Quality Checker")
-    st.write(
-        "Paste your source code below to obtain an automatic, LLM-based review "
-        "along multiple code quality dimensions."
-    )
+    Review several snippets in one API request.
 
-    # Explanation of scoring and the traffic light system
-    with st.expander("How the scoring and traffic light system work"):
-        st.markdown(
-            """
-            **Overall score (0–100)** is derived from eight dimensions (0–10 each):
-
-            - **Readability** – clarity of control flow, formatting, and structure.
-            - **Naming** – meaningful and consistent names for variables, functions, and classes.
-            - **Structure** – modularity, separation of concerns, and function size.
-            - **Comments** – useful, accurate comments and/or docstrings that explain intent.
-            - **Robustness** – basic input validation, error handling, and defensive checks.
-            - **Testability** – how easily core logic can be tested independently of I/O.
-            - **Performance** – absence of obvious inefficiencies for the given task.
-            - **Security** – absence of obvious unsafe patterns (e.g. unsafe eval, raw SQL string concatenation).
+    Returns one analysis per snippet, in input order. Snippets the model did
+    not return a review for get an empty dictionary. If the whole request
+    fails, an empty list is returned and an error message is shown.
+    """
+    try:
+        batch, repaired = _fetch_batch_analysis(
+            client,
+            codes=tuple(codes),
+            language_hint=language_hint,
+            review_level=review_level,
+            persona=persona,
+            explanation_language=explanation_language,
+        )
+    except ValueError as error:
+        st.error(f"The batch analysis response was not valid JSON: {error}")
+        return []
+    except Exception as error:  # noqa: BLE001
+        st.error(f"Error during batch analysis: {error}")
+        return []
 
-            **Score interpretation and traffic light:**
+    if repaired:
+        st.toast("The batch analysis response needed minor JSON repairs.")
 
-            - **0–39**   → Poor (red): serious problems, not recommended as-is.
-            - **40–59**  → Below average (orange): significant refactoring required.
-            - **60–79**  → Acceptable (yellow): usable, but still clear improvement potential.
-            - **80–89**  → Good (green): follows most best practices with only minor issues.
-            - **90–100** → Excellent (bright green): very good, idiomatic, and robust code.
-            """
-        )
+    reviews_by_id = {
+        review.get("id"): review
+        for review in batch.get("reviews", [])
+        if isinstance(review, dict)
+    }
+    return [reviews_by_id.get(index, {}) for index in range(len(codes))]
 
-    # Sidebar configuration controls
-    with st.sidebar:
-        st.header("Configuration")
 
-        language_hint = st.selectbox(
-            "Programming language (hint)",
-            [
-                "Auto",
-                "python",
-                "java",
-                "javascript",
-                "typescript",
-                "c++",
-                "c",
-                "csharp",
-                "go",
-                "rust",
-                "php",
-                "ruby",
-            ],
-            index=0,
-        )
+def pump_refactor(
+    queue: "Queue[Union[str, Exception, None]]",
+    **stream_kwargs: Any,
+) -> None:
+    """
+    Forward the refactor stream to a queue; meant to run in a worker thread.
 
-        review_level = st.selectbox(
-            "Review level",
-            ["Beginner-friendly", "Intermediate", "Senior / very strict"],
-            index=0,
-        )
+    Each chunk is put on the queue as it arrives. An API error is put on the
+    queue instead of being raised, and None always marks the end.
+    """
+    try:
+        for chunk in stream_refactor(**stream_kwargs):
+            queue.put(chunk)
+    except Exception as error:  # noqa: BLE001
+        queue.put(error)
+    finally:
+        queue.put(None)
 
-        persona = st.selectbox(
-            "Reviewer persona",
-            [
-                "Balanced senior engineer",
-                "Strict clean-code purist",
-                "Performance-focused engineer",
-                "Beginner-friendly code coach",
-            ],
-            index=0,
-        )
 
-        explanation_language_ui = st.selectbox(
-            "Feedback language",
-            ["English", "Deutsch"],
-            index=0,
-        )
-        explanation_language = (
-            "German" if explanation_language_ui == "Deutsch" else "English"
-        )
+def run_refactor(queue: "Queue[Union[str, Exception, None]]") -> Iterator[str]:
+    """
+    Yield the refactored code chunks fed by pump_refactor().
 
-        selected_dimensions = st.multiselect(
-            "Dimensions to display",
-            [
-                "readability",
-                "naming",
-                "structure",
-                "comments",
-                "robustness",
-                "testability",
-                "performance",
-                "security",
-            ],
-            default=["readability", "naming", "structure", "comments"],
-        )
+    Meant for st.write_stream, which renders the chunks live and returns the
+    full text. On error, or if no chunk arrives within
+    REFACTOR_IDLE_TIMEOUT_SECONDS, the stream ends early and an error message
+    is shown in the Streamlit interface.
+    """
+    while True:
+        try:
+            item = queue.get(timeout=REFACTOR_IDLE_TIMEOUT_SECONDS)
+        except Empty:
+            st.error("Refactoring timed out.")
+            return
+        if item is None:
+            return
+        if isinstance(item, Exception):
+            st.error(f"Error during refactoring: {item}")
+            return
+        yield item
 
-        generate_refactor = st.checkbox("Generate refactored code", value=True)
 
-        st.markdown("---")
-        st.caption("OpenAI model used for analysis:")
-        st.text(MODEL_NAME_ANALYSIS)
+# =============================================================================
+# Scoring helpers for UI (traffic light)
+# =============================================================================
 
-    # Main input area for the code to be analyzed
-    code_input = st.text_area(
-        "Paste your code here:",
-        height=300,
-        placeholder="Paste your code snippet here for analysis...",
-    )
+# Lower score bounds of each quality level above "Poor", in ascending order
+_QUALITY_BOUNDS: Tuple[int, ...] = (40, 60, 80, 90)
+
+# (label, description, hex_color) for each bucket delimited by _QUALITY_BOUNDS
+_QUALITY_TABLE: Tuple[Tuple[str, str, str], ...] = (
+    (
+        "Poor",
+        "Code quality is poor. Serious refactoring is strongly recommended "
+        "before using this code in production or teaching.",
+        "#c0392b",
+    ),
+    (
+        "Below average",
+        "Code is usable but has significant weaknesses. It should be improved "
+        "to meet common best practices.",
+        "#e67e22",
+    ),
+    (
+        "Acceptable",
+        "Code quality is acceptable. It follows some best practices, but there "
+        "is still clear potential for improvement.",
+        "#f1c40f",
+    ),
+    (
+        "Good",
+        "Code quality is good. It follows most relevant best practices with "
+        "only minor improvement opportunities.",
+        "#27ae60",
+    ),
+    (
+        "Excellent",
+        "Code quality is excellent. It is clear, well-structured, robust and "
+        "close to what an experienced engineer would write.",
+        "#2ecc71",
+    ),
+)
 
-    analyze_button = st.button("🔎 Analyze code")
 
-    if not analyze_button:
-        return
+def get_quality_level(score: int) -> Tuple[str, str, str]:
+    """
+    Map an overall score (0–100) to a label and a color for the traffic light.
 
-    if not code_input.strip():
-        st.warning("Please paste some code before running the analysis.")
-        return
+    Returns
+    -------
+    Tuple[str, str, str]
+        (label, description, hex_color)
+    """
+    return _QUALITY_TABLE[bisect_right(_QUALITY_BOUNDS, score)]
 
-    openai_client = get_client()
-    if openai_client is None:
-        return
 
-    # Run the analysis step and display a spinner while waiting
-    with st.spinner("Running code quality analysis..."):
-        analysis_result = run_analysis(
-            client=openai_client,
-            code=code_input,
-            language_hint=language_hint,
-            review_level=review_level,
-            persona=persona,
-            explanation_language=explanation_language,
-        )
+# =============================================================================
+# Streamlit UI
+# =============================================================================
 
-    if not analysis_result:
-        return
+# Sidebar choices, built once at import time instead of on every rerun
+_LANGUAGE_CHOICES: Tuple[str, ...] = (
+    "Auto",
+    "python",
+    "java",
+    "javascript",
+    "typescript",
+    "c++",
+    "c",
+    "csharp",
+    "go",
+    "rust",
+    "php",
+    "ruby",
+)
+_REVIEW_LEVEL_CHOICES: Tuple[str, ...] = (
+    "Beginner-friendly",
+    "Intermediate",
+    "Senior / very strict",
+)
+_PERSONA_CHOICES: Tuple[str, ...] = (
+    "Balanced senior engineer",
+    "Strict clean-code purist",
+    "Performance-focused engineer",
+    "Beginner-friendly code coach",
+)
+_FEEDBACK_LANGUAGE_CHOICES: Tuple[str, ...] = ("English", "Deutsch")
+_DEFAULT_DIMENSIONS: Tuple[str, ...] = (
+    "readability",
+    "naming",
+    "structure",
+    "comments",
+)
+
+
+def render_review(
+    analysis_result: Dict[str, Any],
+    refactor_stream: Optional[Iterator[str]],
+    generate_refactor: bool,
+    selected_dimensions: FrozenSet[str],
+    language_hint: str,
+    refactor_skipped: bool = False,
+    batch_mode: bool = False,
+) -> None:
+    """
+    Render the review of a single snippet as tabs.
 
+    Used both for the regular single-snippet flow and for each snippet of a
+    batch analysis. The refactor tab is filled last, so the other tabs are
+    already readable while the refactored code streams in.
+    """
     detected_language = analysis_result.get("language", language_hint or "text")
 
-    # Generate refactored code if selected
-    refactored_code = ""
-    if generate_refactor:
-        with st.spinner("Generating refactored code..."):
-            refactored_code = run_refactor(
-                client=openai_client,
-                code=code_input,
-                detected_language=detected_language,
-                review_level=review_level,
-                persona=persona,
-            )
-
     # Tabs to separate the main views of the analysis
     tab_overview, tab_details, tab_refactor, tab_learning = st.tabs(
         ["Overview", "Detailed review", "Refactored code", "Learning mode"]
@@ -567,15 +955,14 @@ def main() -> None:
 
         if filtered_dimensions:
             st.subheader("Dimension scores")
-            df_scores = pd.DataFrame(
-                {
-                    "Dimension": list(filtered_dimensions.keys()),
-                    "Score (0–10)": [
-                        dim.get("score", 0) for dim in filtered_dimensions.values()
-                    ],
-                }
-            ).set_index("Dimension")
-            st.bar_chart(df_scores)
+            # A plain column mapping is enough for st.bar_chart at this size.
+            scores = {
+                "Dimension": list(filtered_dimensions.keys()),
+                "Score (0–10)": [
+                    dim.get("score", 0) for dim in filtered_dimensions.values()
+                ],
+            }
+            st.bar_chart(scores, x="Dimension", y="Score (0–10)")
 
         st.divider()
 
@@ -616,18 +1003,6 @@ def main() -> None:
             with st.expander(expander_label, expanded=False):
                 st.write(comment)
 
-    # --------------------- Refactored code tab ----------------------
-    with tab_refactor:
-        if generate_refactor and refactored_code:
-            st.write("Proposed refactored version of your code:")
-            st.code(refactored_code, language=detected_language or "text")
-        elif generate_refactor:
-            st.warning("No refactored code could be generated.")
-        else:
-            st.info(
-                "Refactoring is disabled. Enable it in the configuration sidebar."
-            )
-
     # ----------------------- Learning mode tab ----------------------
     with tab_learning:
         st.write(
@@ -637,7 +1012,6 @@ def main() -> None:
         learning_tips = analysis_result.get("learning_tips", [])
         if not learning_tips:
             st.info("No specific learning tips were provided by the model.")
-            return
 
         for index, tip in enumerate(learning_tips, start=1):
             title = tip.get("title", "")
@@ -656,6 +1030,302 @@ def main() -> None:
                 st.markdown("**Improved example:**")
                 st.code(better_example, language=detected_language or "text")
 
+    # --------------------- Refactored code tab ----------------------
+    with tab_refactor:
+        if refactor_stream is not None:
+            st.write("Proposed refactored version of your code:")
+            # Stream the raw text first, then swap in the highlighted block.
+            code_slot = st.empty()
+            with code_slot.container():
+                refactored_code = st.write_stream(refactor_stream)
+            if refactored_code:
+                code_slot.code(refactored_code, language=detected_language or "text")
+            else:
+                code_slot.warning("No refactored code could be generated.")
+        elif refactor_skipped:
+            st.success(
+                f"The code already scores {REFACTOR_SKIP_SCORE}+, "
+                "so refactoring was skipped."
+            )
+        elif batch_mode:
+            st.info("Refactoring is not available in batch mode.")
+        elif generate_refactor:
+            st.warning("No refactored code could be generated.")
+        else:
+            st.info(
+                "Refactoring is disabled. Enable it in the configuration sidebar."
+            )
+
+
+def render_batch(
+    client: OpenAI,
+    snippets: List[str],
+    language_hint: str,
+    review_level: str,
+    persona: str,
+    explanation_language: str,
+    selected_dimensions: FrozenSet[str],
+) -> None:
+    """
+    Review several snippets in one request and render one tab per snippet.
+
+    Refactoring is not requested in batch mode.
+    """
+    spinner_text = f"Running code quality analysis for {len(snippets)} snippets..."
+    with st.spinner(spinner_text):
+        analysis_results = run_batch_analysis(
+            client=client,
+            codes=snippets,
+            language_hint=language_hint,
+            review_level=review_level,
+            persona=persona,
+            explanation_language=explanation_language,
+        )
+
+    if not analysis_results:
+        return
+
+    st.caption("Refactoring is not available in batch mode.")
+    snippet_tabs = st.tabs(
+        [f"Snippet {index + 1}" for index in range(len(snippets))]
+    )
+    for snippet_tab, analysis_result in zip(snippet_tabs, analysis_results):
+        with snippet_tab:
+            if not analysis_result:
+                st.warning("No review was returned for this snippet.")
+                continue
+
+            render_review(
+                analysis_result,
+                refactor_stream=None,
+                generate_refactor=False,
+                selected_dimensions=selected_dimensions,
+                language_hint=language_hint,
+                batch_mode=True,
+            )
+
+
+def main() -> None:
+    """
+    Render the Code Quality Checker page.
+    """
+    st.title("🔍 Code Quality Checker")
+    st.write(
+        "Paste your source code below to obtain an automatic, LLM-based review "
+        "along multiple code quality dimensions."
+    )
+
+    # Explanation of scoring and the traffic light system
+    with st.expander("How the scoring and traffic light system work"):
+        st.markdown(
+            """
+            **Overall score (0–100)** is derived from eight dimensions (0–10 each):
+
+            - **Readability** – clarity of control flow, formatting, and structure.
+            - **Naming** – meaningful and consistent names for variables, functions, and classes.
+            - **Structure** – modularity, separation of concerns, and function size.
+            - **Comments** – useful, accurate comments and/or docstrings that explain intent.
+            - **Robustness** – basic input validation, error handling, and defensive checks.
+            - **Testability** – how easily core logic can be tested independently of I/O.
+            - **Performance** – absence of obvious inefficiencies for the given task.
+            - **Security** – absence of obvious unsafe patterns (e.g. unsafe eval, raw SQL string concatenation).
+
+            **Score interpretation and traffic light:**
+
+            - **0–39**   → Poor (red): serious problems, not recommended as-is.
+            - **40–59**  → Below average (orange): significant refactoring required.
+            - **60–79**  → Acceptable (yellow): usable, but still clear improvement potential.
+            - **80–89**  → Good (green): follows most best practices with only minor issues.
+            - **90–100** → Excellent (bright green): very good, idiomatic, and robust code.
+            """
+        )
+
+    # Sidebar configuration controls
+    with st.sidebar:
+        st.header("Configuration")
+
+        language_hint = st.selectbox(
+            "Programming language (hint)",
+            _LANGUAGE_CHOICES,
+            index=0,
+        )
+
+        review_level = st.selectbox(
+            "Review level",
+            _REVIEW_LEVEL_CHOICES,
+            index=0,
+        )
+
+        persona = st.selectbox(
+            "Reviewer persona",
+            _PERSONA_CHOICES,
+            index=0,
+        )
+
+        explanation_language_ui = st.selectbox(
+            "Feedback language",
+            _FEEDBACK_LANGUAGE_CHOICES,
+            index=0,
+        )
+        explanation_language = (
+            "German" if explanation_language_ui == "Deutsch" else "English"
+        )
+
+        selected_dimensions = st.multiselect(
+            "Dimensions to display",
+            DIMENSION_NAMES,
+            default=_DEFAULT_DIMENSIONS,
+        )
+        # The review tabs only test membership, so a set is built once here.
+        selected_dimensions = frozenset(selected_dimensions)
+
+        generate_refactor = st.checkbox("Generate refactored code", value=True)
+
+        batch_mode = st.checkbox(
+            "Batch mode",
+            value=False,
+            help=(
+                f"Review several snippets in one request. Separate snippets "
+                f"with a line containing only '{BATCH_SEPARATOR}'."
+            ),
+        )
+
+        # Results are cached per code and settings; this forces fresh requests.
+        if st.button("Force refresh"):
+            _fetch_analysis.clear()
+            _fetch_batch_analysis.clear()
+            st.toast("Cached reviews cleared.")
+
+        st.markdown("---")
+        st.caption("OpenAI model used for analysis:")
+        st.text(MODEL_NAME_ANALYSIS)
+
+    # Main input area for the code to be analyzed
+    code_input = st.text_area(
+        "Paste your code here:",
+        height=300,
+        placeholder="Paste your code snippet here for analysis...",
+    )
+
+    analyze_button = st.button("🔎 Analyze code")
+
+    if not analyze_button:
+        return
+
+    if not code_input.strip():
+        st.warning("Please paste some code before running the analysis.")
+        return
+
+    code_input = normalize_whitespace(code_input)
+    st.caption(
+        "Trailing whitespace and extra blank lines are removed and tabs are "
+        "expanded to 4 spaces before the code is sent."
+    )
+
+    openai_client = get_client()
+    if openai_client is None:
+        return
+
+    # The same clipped input is used for analysis and refactoring.
+    code_input, truncated = truncate_code(code_input)
+    if truncated:
+        st.warning(
+            f"The code was truncated to about {MAX_INPUT_TOKENS} tokens for analysis."
+        )
+
+    snippets = split_snippets(code_input) if batch_mode else [code_input]
+    if len(snippets) > 1:
+        render_batch(
+            openai_client,
+            snippets=snippets,
+            language_hint=language_hint,
+            review_level=review_level,
+            persona=persona,
+            explanation_language=explanation_language,
+            selected_dimensions=selected_dimensions,
+        )
+        return
+
+    code_input = snippets[0]
+
+    # The refactor request only needs the raw code, so it is sent alongside
+    # the analysis instead of waiting for it. The language hint stands in for
+    # the detected language, which is not known until the analysis returns.
+    # Worker threads get the script run context so st.error() still works.
+    spinner_text = (
+        "Running analysis and refactoring in parallel..."
+        if generate_refactor
+        else "Running code quality analysis..."
+    )
+    # The refactor worker feeds its chunks into a queue that the refactor tab
+    # renders live. If the analysis fails or the code already scores
+    # REFACTOR_SKIP_SCORE or more, the cancel event closes the stream early.
+    # The executor is shut down without waiting and without cancelling queued
+    # jobs: the refactor worker may not have started yet (e.g. when the
+    # analysis is a cache hit), and it must still run to put the end marker.
+    refactor_queue: "Queue[Union[str, Exception, None]]" = Queue()
+    cancel_refactor = Event()
+    executor = ThreadPoolExecutor(
+        max_workers=2,
+        initializer=add_script_run_ctx,
+        initargs=(None, get_script_run_ctx()),
+    )
+    with st.spinner(spinner_text):
+        try:
+            analysis_future = executor.submit(
+                run_analysis,
+                client=openai_client,
+                code=code_input,
+                language_hint=language_hint,
+                review_level=review_level,
+                persona=persona,
+                explanation_language=explanation_language,
+            )
+            if generate_refactor:
+                executor.submit(
+                    pump_refactor,
+                    refactor_queue,
+                    client=openai_client,
+                    code=code_input,
+                    detected_language=(
+                        language_hint if language_hint != "Auto" else "unknown"
+                    ),
+                    review_level=review_level,
+                    persona=persona,
+                    cancel=cancel_refactor,
+                )
+
+            analysis_result = analysis_future.result()
+        finally:
+            executor.shutdown(wait=False)
+
+    overall_score = int(analysis_result.get("overall_score", 0))
+    refactor_skipped = generate_refactor and overall_score >= REFACTOR_SKIP_SCORE
+
+    if not analysis_result or refactor_skipped:
+        cancel_refactor.set()
+    if not analysis_result:
+        return
+
+    # A rerun or Stop interrupts rendering with an exception. The worker is
+    # then told to stop, so it does not keep consuming the stream and holding
+    # one of the shared request slots.
+    try:
+        render_review(
+            analysis_result,
+            refactor_stream=(
+                run_refactor(refactor_queue)
+                if generate_refactor and not refactor_skipped
+                else None
+            ),
+            generate_refactor=generate_refactor,
+            selected_dimensions=selected_dimensions,
+            language_hint=language_hint,
+            refactor_skipped=refactor_skipped,
+        )
+    finally:
+        cancel_refactor.set()
+
 
 # Execution support
 if __name__ == "__main__":
@@ -59,6 +59,21 @@ def _load_page_callable(module_name: str, entrypoint: str = "main") -> Callable[
     return page_fn
 
 
+def _lazy_page(module_name: str, entrypoint: str = "main") -> Callable[[], None]:
+    """
+    Return a page callable that imports its module only when the page is shown.
+
+    Importing every subpage while building the navigation would load heavy
+    dependencies (e.g. openai, matplotlib) even for visitors who stay on the
+    Home page. Modules imported once are served from Python's module cache.
+    """
+
+    def _render_page() -> None:
+        _load_page_callable(module_name, entrypoint)()
+
+    return _render_page
+
+
 def main() -> None:
     """
     App entrypoint.
@@ -76,10 +91,11 @@ def main() -> None:
         layout="wide",
     )
 
-    # Load subpages as callables (each page module exposes a `main()` function).
-    code_checker_page = _load_page_callable("code_checker")
-    learning_page = _load_page_callable("learning_app")
-    arcade_page = _load_page_callable("arcade")
+    # Subpages are imported lazily, on first visit (each page module exposes a
+    # `main()` function).
+    code_checker_page = _lazy_page("code_checker")
+    learning_page = _lazy_page("learning_app")
+    arcade_page = _lazy_page("arcade")
 
     # url_path must be unique across pages. If not set, Streamlit may infer the same
     # pathname from identical callable names (e.g., multiple functions named "main").
@@ -8,12 +8,18 @@ This module renders:
    - A heatmap showing guideline impact on broader quality outcomes.
 """
 
-import math
-from typing import List, Sequence
+from __future__ import annotations
 
-import matplotlib.pyplot as plt
+import io
+from typing import TYPE_CHECKING, List, NamedTuple, Sequence, Tuple, Union
+
+import altair as alt
+import numpy as np
 import streamlit as st
 
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+
 
 # -----------------------------
 # App configuration and data
@@ -22,7 +28,7 @@ import streamlit as st
 APP_TITLE = "Code Quality Guidelines"
 
 # These focus weights reflect how a beginner-friendly review might prioritize each guideline.
-FOCUS_WEIGHTS: List[int] = [88, 78, 74, 85, 80, 87]
+FOCUS_WEIGHTS: np.ndarray = np.array([88, 78, 74, 85, 80, 87], dtype=np.uint8)
 
 GUIDELINES: List[str] = [
     "Readable naming",
@@ -35,15 +41,140 @@ GUIDELINES: List[str] = [
 
 OUTCOMES: List[str] = ["Readability", "Maintainability", "Flexibility", "Reliability"]
 
+# Height of the heatmap in pixels; the width follows the container.
+HEATMAP_HEIGHT = 340
+
+# Resolution of the radar chart image; twice the figure default for sharp
+# rendering on high-DPI displays.
+RADAR_DPI = 200
+
 # Impact scale: 0–5 (higher means stronger impact on the outcome).
-IMPACT_MAP: List[List[int]] = [
-    [5, 4, 2, 2],
-    [4, 4, 2, 2],
-    [2, 4, 5, 2],
-    [4, 5, 3, 3],
-    [5, 4, 2, 2],
-    [2, 3, 2, 5],
-]
+# Stored as a contiguous uint8 array, so charts get it without conversion.
+IMPACT_MAP: np.ndarray = np.array(
+    [
+        [5, 4, 2, 2],
+        [4, 4, 2, 2],
+        [2, 4, 5, 2],
+        [4, 5, 3, 3],
+        [5, 4, 2, 2],
+        [2, 3, 2, 5],
+    ],
+    dtype=np.uint8,
+)
+
+
+# -----------------------------
+# Guideline content
+# -----------------------------
+
+class ExampleSection(NamedTuple):
+    """
+    Content of one guideline section with a bad and a good code example.
+    """
+
+    title: str
+    bullets_markdown: str
+    bad_code: str
+    good_code: str
+
+
+# Overview cards as (title, text). The whole card row is rendered once at
+# import time as a single CSS grid element instead of four columns.
+_METRIC_CARDS: Tuple[Tuple[str, str], ...] = (
+    ("Clarity", "Improve readability and consistency."),
+    ("Safety", "Make changes safer and cheaper."),
+    ("Prevention", "Avoid common mistakes early."),
+    ("Collaboration", "Keep code easy to review in a team."),
+)
+
+_CARD_TEMPLATE = (
+    "<div class='metric-card'><div class='metric-title'>{title}</div>"
+    "<div class='metric-text'>{text}</div></div>"
+)
+
+_CARDS_HTML = (
+    "<div class='metric-grid'>"
+    + "".join(
+        _CARD_TEMPLATE.format(title=title, text=text) for title, text in _METRIC_CARDS
+    )
+    + "</div>"
+)
+
+EXAMPLE_SECTIONS: Tuple[ExampleSection, ...] = (
+    ExampleSection(
+        title="Readable structure",
+        bullets_markdown=(
+            "- Use names that communicate intent\n"
+            "- Avoid ambiguous shortcuts\n"
+            "- Prefer simple flow over clever tricks"
+        ),
+        bad_code="def f(x):\n    return x * 3.14",
+        good_code=(
+            "PI = 3.14159\n\n"
+            "def calculate_circle_area(radius: float) -> float:\n"
+            "    return PI * radius ** 2"
+        ),
+    ),
+    ExampleSection(
+        title="Meaningful comments",
+        bullets_markdown=(
+            "- Add notes for reasoning or constraints\n"
+            "- Skip commentary that restates the code\n"
+            "- Use docstrings for non-trivial functions"
+        ),
+        bad_code="total = price + tax  # add tax",
+        good_code=(
+            "def calculate_total(price: float, tax_rate: float) -> float:\n"
+            '    """Return the final price including tax."""\n'
+            "    return price * (1 + tax_rate)"
+        ),
+    ),
+    ExampleSection(
+        title="Avoid hidden rules (no hardcoding)",
+        bullets_markdown=(
+            "- Fixed numbers often represent a rule or assumption\n"
+            "- Expose rules as parameters or defaults\n"
+            "- This makes the code easier to adapt later"
+        ),
+        bad_code="def discount(price):\n    return price * 0.9",
+        good_code=(
+            "def discount(price: float, rate: float = 0.1) -> float:\n"
+            "    return price * (1 - rate)"
+        ),
+    ),
+    ExampleSection(
+        title="Small, focused functions",
+        bullets_markdown=(
+            "- One function should do one job\n"
+            "- Keep logic separate from output / I/O\n"
+            "- Smaller pieces are easier to test"
+        ),
+        bad_code=(
+            "def process(items):\n"
+            "    for item in items:\n"
+            "        print(item * 2)"
+        ),
+        good_code=(
+            "def double_items(items: List[int]) -> List[int]:\n"
+            "    return [item * 2 for item in items]"
+        ),
+    ),
+    ExampleSection(
+        title="Defensive programming",
+        bullets_markdown=(
+            "- Validate important inputs\n"
+            "- Handle edge cases explicitly\n"
+            "- Fail clearly instead of silently"
+        ),
+        bad_code="def divide(a, b):\n    return a / b",
+        good_code=(
+            "def divide(a: float, b: float) -> float:\n"
+            "    if b == 0:\n"
+            "        raise ValueError('b must not be zero')\n"
+            "    return a / b"
+        ),
+    ),
+)
 
 
 # -----------------------------
@@ -68,7 +199,7 @@ def _require_non_empty_labels(labels: Sequence[str], name: str) -> None:
 
 
 def _require_matrix_shape(
-    data: Sequence[Sequence[int]],
+    data: Union[np.ndarray, Sequence[Sequence[int]]],
     expected_rows: int,
     expected_cols: int,
 ) -> None:
@@ -78,12 +209,21 @@ def _require_matrix_shape(
     Parameters
     ----------
     data:
-        2D matrix-like structure.
+        2D matrix-like structure or NumPy array.
     expected_rows:
         Required number of rows.
     expected_cols:
         Required number of columns.
     """
+    # NumPy arrays carry their shape, so their rows need not be walked.
+    shape = getattr(data, "shape", None)
+    if shape is not None:
+        if len(shape) != 2 or shape[0] != expected_rows:
+            raise ValueError("Data row count must match the number of row labels.")
+        if shape[1] != expected_cols:
+            raise ValueError("Each data row must match the number of column labels.")
+        return
+
     if len(data) != expected_rows:
         raise ValueError("Data row count must match the number of row labels.")
     for row in data:
@@ -91,15 +231,41 @@ def _require_matrix_shape(
             raise ValueError("Each data row must match the number of column labels.")
 
 
+# -----------------------------
+# Scoring helpers
+# -----------------------------
+
+def compute_outcome_scores(weights: np.ndarray, impact: np.ndarray) -> np.ndarray:
+    """
+    Compute the focus-weighted average impact on each quality outcome.
+
+    Parameters
+    ----------
+    weights:
+        Focus weight per guideline, shape (n_guidelines,).
+    impact:
+        Impact matrix with shape (n_guidelines, n_outcomes).
+
+    Returns
+    -------
+    numpy.ndarray
+        Weighted impact per outcome on the 0–5 impact scale.
+    """
+    # Cast before the product: uint8 inputs would overflow in the weighted sum.
+    weights = weights.astype(np.float64)
+    return weights @ impact / weights.sum()
+
+
 # -----------------------------
 # Chart rendering
 # -----------------------------
 
 def create_radar_chart(
     labels: Sequence[str],
-    values: Sequence[int],
+    values: Union[np.ndarray, Sequence[int]],
     title: str = "",
-) -> plt.Figure:
+    validate: bool = True,
+) -> Figure:
     """
     Create a radar (spider) chart.
 
@@ -111,25 +277,47 @@ def create_radar_chart(
         Values corresponding to each label.
     title:
         Optional chart title.
+    validate:
+        Check the inputs first. Only skip this for trusted module constants.
 
     Returns
     -------
     matplotlib.figure.Figure
         The rendered matplotlib figure.
     """
-    _require_non_empty_labels(labels, name="Labels")
+    if validate:
+        _require_non_empty_labels(labels, name="Labels")
+
+        if len(labels) != len(values):
+            raise ValueError("Labels and values must match in length.")
 
-    if len(labels) != len(values):
-        raise ValueError("Labels and values must match in length.")
+    return _build_radar_chart(
+        tuple(labels),
+        np.asarray(values, dtype=np.float64),
+        title,
+    )
 
+
+def _build_radar_chart(
+    labels: Tuple[str, ...],
+    values: np.ndarray,
+    title: str,
+) -> Figure:
+    """
+    Build the radar chart figure for already validated inputs.
+    """
     # Compute angles around the circle and repeat the first point to close the polygon.
-    angles = [2 * math.pi * i / len(labels) for i in range(len(labels))]
-    angles.append(angles[0])
+    angles = np.linspace(0, 2 * np.pi, len(labels), endpoint=False)
+    angles = np.append(angles, angles[0])
+
+    values_closed = np.append(values, values[0])
 
-    values_list = list(values)
-    values_closed = values_list + [values_list[0]]
+    # Matplotlib is imported on first use, so pages and tabs without the radar
+    # chart do not pay its import cost. Figure is built without pyplot, so it
+    # never enters pyplot's global registry and is saved with Agg.
+    from matplotlib.figure import Figure
 
-    fig = plt.figure(figsize=(7.2, 4.8))
+    fig = Figure(figsize=(7.2, 4.8))
     ax = fig.add_subplot(111, polar=True)
 
     ax.plot(angles, values_closed, linewidth=2)
@@ -154,15 +342,38 @@ def create_radar_chart(
     return fig
 
 
+@st.cache_data(show_spinner=False)
+def _radar_chart_png(labels: Tuple[str, ...], values: np.ndarray) -> bytes:
+    """
+    Render the radar chart for trusted data to PNG bytes once per input.
+
+    Only the bytes are cached; the figure is built here and dropped after
+    saving, so no Matplotlib objects stay alive between reruns. The layout is
+    fixed by subplots_adjust, so the extra draw pass that bbox_inches="tight"
+    needs to measure text is skipped.
+    """
+    figure = _build_radar_chart(labels, np.asarray(values, dtype=np.float64), "")
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format="png", dpi=RADAR_DPI)
+    # The figure was never registered with pyplot, so there is nothing to
+    # close; clearing it releases the artists right away.
+    figure.clear()
+    return buffer.getvalue()
+
+
 def create_heatmap_chart(
     row_labels: Sequence[str],
     col_labels: Sequence[str],
-    data: Sequence[Sequence[int]],
+    data: Union[np.ndarray, Sequence[Sequence[int]]],
     title: str = "",
-) -> plt.Figure:
+    validate: bool = True,
+) -> alt.LayerChart:
     """
     Create a heatmap chart with cell annotations.
 
+    The chart is a Vega-Lite spec that the browser renders, so no image has
+    to be rasterized on the server.
+
     Parameters
     ----------
     row_labels:
@@ -173,49 +384,81 @@ def create_heatmap_chart(
         Matrix of values with shape (len(row_labels), len(col_labels)).
     title:
         Optional chart title.
+    validate:
+        Check the inputs first. Only skip this for trusted module constants.
 
     Returns
     -------
-    matplotlib.figure.Figure
-        The rendered matplotlib figure.
+    altair.LayerChart
+        Colored cells layered with their values. Charts are cached per input,
+        so the returned chart must not be modified.
     """
-    _require_non_empty_labels(row_labels, name="Row labels")
-    _require_non_empty_labels(col_labels, name="Column labels")
-    _require_matrix_shape(
-        data,
-        expected_rows=len(row_labels),
-        expected_cols=len(col_labels),
-    )
-
-    fig, ax = plt.subplots(figsize=(7.2, 4.8))
-    image = ax.imshow(data, aspect="auto", cmap="Blues", vmin=0, vmax=5)
+    if validate:
+        _require_non_empty_labels(row_labels, name="Row labels")
+        _require_non_empty_labels(col_labels, name="Column labels")
+        _require_matrix_shape(
+            data,
+            expected_rows=len(row_labels),
+            expected_cols=len(col_labels),
+        )
 
-    if title:
-        ax.set_title(title, pad=10)
+    return _build_heatmap_chart(
+        tuple(row_labels),
+        tuple(col_labels),
+        np.asarray(data),
+        title,
+    )
 
-    ax.set_xlabel("Quality outcome")
-    ax.set_ylabel("Guideline")
 
-    ax.set_xticks(range(len(col_labels)))
-    ax.set_xticklabels(list(col_labels), fontsize=10)
+@st.cache_resource(show_spinner=False)
+def _build_heatmap_chart(
+    row_labels: Tuple[str, ...],
+    col_labels: Tuple[str, ...],
+    data: np.ndarray,
+    title: str,
+) -> alt.LayerChart:
+    """
+    Build the heatmap chart once per distinct input.
+    """
+    # One record per row; the fold transform reshapes them into one record
+    # per cell in the browser, so no per-cell work happens in Python.
+    records = [
+        {"guideline": row_label, **dict(zip(col_labels, row))}
+        for row_label, row in zip(row_labels, data.tolist())
+    ]
+
+    base = (
+        alt.Chart(alt.Data(values=records))
+        .transform_fold(list(col_labels), as_=["outcome", "impact"])
+        .encode(
+            x=alt.X(
+                "outcome:N",
+                sort=list(col_labels),
+                title="Quality outcome",
+                axis=alt.Axis(labelAngle=0),
+            ),
+            y=alt.Y("guideline:N", sort=list(row_labels), title="Guideline"),
+        )
+    )
 
-    ax.set_yticks(range(len(row_labels)))
-    ax.set_yticklabels(list(row_labels), fontsize=10)
+    # White cell borders replace the light gridlines between rows/columns.
+    cells = base.mark_rect(stroke="white", strokeWidth=1).encode(
+        color=alt.Color(
+            "impact:Q",
+            scale=alt.Scale(scheme="blues", domain=[0, 5]),
+            title="Impact (0–5)",
+        ),
+    )
 
     # Annotate each cell with its numeric impact score for quick interpretation.
-    for row_idx, row in enumerate(data):
-        for col_idx, value in enumerate(row):
-            ax.text(col_idx, row_idx, value, ha="center", va="center", fontsize=9)
-
-    # Light gridlines improve scanning across rows/columns.
-    ax.set_xticks([x - 0.5 for x in range(1, len(col_labels))], minor=True)
-    ax.set_yticks([y - 0.5 for y in range(1, len(row_labels))], minor=True)
-    ax.grid(which="minor", linestyle="-", linewidth=0.6, alpha=0.25)
-    ax.tick_params(which="minor", bottom=False, left=False)
-
-    fig.colorbar(image, ax=ax, shrink=0.9, label="Impact (0–5)")
-    fig.tight_layout()
-    return fig
+    annotations = base.mark_text(fontSize=12, color="black").encode(
+        text="impact:Q",
+    )
+
+    chart = (cells + annotations).properties(height=HEATMAP_HEIGHT)
+    if title:
+        chart = chart.properties(title=title)
+    return chart
 
 
 # -----------------------------
@@ -224,7 +467,7 @@ def create_heatmap_chart(
 
 def render_example_section(
     title: str,
-    bullets: Sequence[str],
+    bullets_markdown: str,
     bad_code: str,
     good_code: str,
 ) -> None:
@@ -235,15 +478,15 @@ def render_example_section(
     ----------
     title:
         Section title shown as a header.
-    bullets:
-        Bullet points explaining the guideline intent.
+    bullets_markdown:
+        Markdown bullet list explaining the guideline intent.
     bad_code:
         Code snippet showing the anti-pattern.
     good_code:
         Code snippet showing the recommended pattern.
     """
     st.markdown(f"### {title}")
-    st.markdown("\n".join(f"- {bullet}" for bullet in bullets))
+    st.markdown(bullets_markdown)
 
     left_col, right_col = st.columns(2, gap="large")
 
@@ -256,136 +499,29 @@ def render_example_section(
         st.code(good_code, language="python")
 
 
+@st.fragment
 def render_guidelines() -> None:
     """
     Render the guideline overview and the example sections.
+
+    Runs as a fragment, so interactions inside it rerun only this tab.
     """
     st.markdown("## Overview")
 
     # Overview cards help users understand the purpose quickly.
-    col1, col2, col3, col4 = st.columns(4)
-    with col1:
-        st.markdown(
-            "<div class='metric-card'><div class='metric-title'>Clarity</div>"
-            "<div class='metric-text'>Improve readability and consistency.</div></div>",
-            unsafe_allow_html=True,
-        )
-    with col2:
-        st.markdown(
-            "<div class='metric-card'><div class='metric-title'>Safety</div>"
-            "<div class='metric-text'>Make changes safer and cheaper.</div></div>",
-            unsafe_allow_html=True,
-        )
-    with col3:
-        st.markdown(
-            "<div class='metric-card'><div class='metric-title'>Prevention</div>"
-            "<div class='metric-text'>Avoid common mistakes early.</div></div>",
-            unsafe_allow_html=True,
-        )
-    with col4:
-        st.markdown(
-            "<div class='metric-card'><div class='metric-title'>Collaboration</div>"
-            "<div class='metric-text'>Keep code easy to review in a team.</div></div>",
-            unsafe_allow_html=True,
-        )
+    st.markdown(_CARDS_HTML, unsafe_allow_html=True)
 
-    st.markdown('<div class="spacer"></div>', unsafe_allow_html=True)
-
-    with st.container(border=True):
-        render_example_section(
-            title="Readable structure",
-            bullets=[
-                "Use names that communicate intent",
-                "Avoid ambiguous shortcuts",
-                "Prefer simple flow over clever tricks",
-            ],
-            bad_code="def f(x):\n    return x * 3.14",
-            good_code=(
-                "PI = 3.14159\n\n"
-                "def calculate_circle_area(radius: float) -> float:\n"
-                "    return PI * radius ** 2"
-            ),
-        )
-
-    st.markdown('<div class="spacer"></div>', unsafe_allow_html=True)
-
-    with st.container(border=True):
-        render_example_section(
-            title="Meaningful comments",
-            bullets=[
-                "Add notes for reasoning or constraints",
-                "Skip commentary that restates the code",
-                "Use docstrings for non-trivial functions",
-            ],
-            bad_code="total = price + tax  # add tax",
-            good_code=(
-                "def calculate_total(price: float, tax_rate: float) -> float:\n"
-                '    """Return the final price including tax."""\n'
-                "    return price * (1 + tax_rate)"
-            ),
-        )
-
-    st.markdown('<div class="spacer"></div>', unsafe_allow_html=True)
-
-    with st.container(border=True):
-        render_example_section(
-            title="Avoid hidden rules (no hardcoding)",
-            bullets=[
-                "Fixed numbers often represent a rule or assumption",
-                "Expose rules as parameters or defaults",
-                "This makes the code easier to adapt later",
-            ],
-            bad_code="def discount(price):\n    return price * 0.9",
-            good_code=(
-                "def discount(price: float, rate: float = 0.1) -> float:\n"
-                "    return price * (1 - rate)"
-            ),
-        )
-
-    st.markdown('<div class="spacer"></div>', unsafe_allow_html=True)
-
-    with st.container(border=True):
-        render_example_section(
-            title="Small, focused functions",
-            bullets=[
-                "One function should do one job",
-                "Keep logic separate from output / I/O",
-                "Smaller pieces are easier to test",
-            ],
-            bad_code=(
-                "def process(items):\n"
-                "    for item in items:\n"
-                "        print(item * 2)"
-            ),
-            good_code=(
-                "def double_items(items: List[int]) -> List[int]:\n"
-                "    return [item * 2 for item in items]"
-            ),
-        )
-
-    st.markdown('<div class="spacer"></div>', unsafe_allow_html=True)
-
-    with st.container(border=True):
-        render_example_section(
-            title="Defensive programming",
-            bullets=[
-                "Validate important inputs",
-                "Handle edge cases explicitly",
-                "Fail clearly instead of silently",
-            ],
-            bad_code="def divide(a, b):\n    return a / b",
-            good_code=(
-                "def divide(a: float, b: float) -> float:\n"
-                "    if b == 0:\n"
-                "        raise ValueError('b must not be zero')\n"
-                "    return a / b"
-            ),
-        )
+    for section in EXAMPLE_SECTIONS:
+        with st.container(border=True):
+            render_example_section(*section)
 
 
+@st.fragment
 def render_visuals() -> None:
     """
     Render the radar and heatmap visuals.
+
+    Runs as a fragment, so interactions inside it rerun only this tab.
     """
     st.markdown("## Visual summary")
     st.caption(
@@ -393,76 +529,94 @@ def render_visuals() -> None:
         "map to broader quality outcomes."
     )
 
+    # The chart data are module constants, so input validation is skipped.
     left_col, right_col = st.columns(2, gap="large")
 
     with left_col:
         with st.container(border=True):
             st.markdown("<div class='panel-title'>Guideline focus</div>", unsafe_allow_html=True)
             st.caption("Relative emphasis across the guideline set.")
-            figure = create_radar_chart(GUIDELINES, FOCUS_WEIGHTS, title="")
-            st.pyplot(figure, use_container_width=True)
+            radar_png = _radar_chart_png(tuple(GUIDELINES), FOCUS_WEIGHTS)
+            st.image(radar_png, use_container_width=True)
 
     with right_col:
         with st.container(border=True):
             st.markdown("<div class='panel-title'>Impact on outcomes</div>", unsafe_allow_html=True)
             st.caption("How each guideline contributes to common quality goals.")
-            figure = create_heatmap_chart(GUIDELINES, OUTCOMES, IMPACT_MAP, title="")
-            st.pyplot(figure, use_container_width=True)
+            chart = create_heatmap_chart(
+                GUIDELINES, OUTCOMES, IMPACT_MAP, title="", validate=False
+            )
+            st.altair_chart(chart, use_container_width=True)
 
 
 # -----------------------------
 # App entrypoint
 # -----------------------------
 
+# Global style sheet, kept as one constant instead of being rebuilt per rerun.
+_GLOBAL_CSS = """
+<style>
+.block-container { padding-top: 2.0rem; padding-bottom: 2.0rem; }
+
+/* Extra space above bordered sections, instead of separate spacer elements.
+   The child combinator limits this to containers placed directly in a block,
+   not the wrappers Streamlit puts around columns, tabs and expanders. */
+div[data-testid="stVerticalBlock"] > div[data-testid="stVerticalBlockBorderWrapper"] {
+    margin-top: 1.0rem;
+}
+
+/* Typography */
+h1, h2, h3 { letter-spacing: -0.02em; }
+.stCaption { opacity: 0.85; }
+
+/* Card-like elements, laid out like st.columns(4) and stacked on narrow screens */
+.metric-grid {
+    display: grid;
+    grid-template-columns: repeat(4, minmax(0, 1fr));
+    gap: 1rem;
+}
+@media (max-width: 640px) {
+    .metric-grid { grid-template-columns: 1fr; }
+}
+.metric-card {
+    border: 1px solid rgba(0,0,0,0.08);
+    border-radius: 14px;
+    padding: 14px 14px 12px 14px;
+    background: rgba(255,255,255,0.65);
+    box-shadow: 0 1px 10px rgba(0,0,0,0.04);
+    min-height: 84px;
+}
+.metric-title {
+    font-weight: 700;
+    font-size: 0.95rem;
+    margin-bottom: 6px;
+}
+.metric-text {
+    font-size: 0.90rem;
+    line-height: 1.25rem;
+    opacity: 0.9;
+}
+
+.panel-title {
+    font-weight: 750;
+    font-size: 1.05rem;
+    margin-bottom: 0.2rem;
+}
+
+/* Improve code block readability slightly */
+pre { border-radius: 12px !important; }
+</style>
+"""
+
+
 def _inject_global_css() -> None:
     """
     Inject CSS helpers for spacing and a consistent visual style.
 
-    Streamlit does not provide a dedicated spacing primitive, so a small helper
-    class keeps spacing consistent without repeating inline styles.
+    Streamlit does not provide a dedicated spacing primitive, so section
+    spacing comes from a CSS margin rather than extra spacer elements.
     """
-    st.markdown(
-        """
-        <style>
-        .block-container { padding-top: 2.0rem; padding-bottom: 2.0rem; }
-        .spacer { height: 1.0rem; }
-
-        /* Typography */
-        h1, h2, h3 { letter-spacing: -0.02em; }
-        .stCaption { opacity: 0.85; }
-
-        /* Card-like elements */
-        .metric-card {
-            border: 1px solid rgba(0,0,0,0.08);
-            border-radius: 14px;
-            padding: 14px 14px 12px 14px;
-            background: rgba(255,255,255,0.65);
-            box-shadow: 0 1px 10px rgba(0,0,0,0.04);
-            min-height: 84px;
-        }
-        .metric-title {
-            font-weight: 700;
-            font-size: 0.95rem;
-            margin-bottom: 6px;
-        }
-        .metric-text {
-            font-size: 0.90rem;
-            line-height: 1.25rem;
-            opacity: 0.9;
-        }
-
-        .panel-title {
-            font-weight: 750;
-            font-size: 1.05rem;
-            margin-bottom: 0.2rem;
-        }
-
-        /* Improve code block readability slightly */
-        pre { border-radius: 12px !important; }
-        </style>
-        """,
-        unsafe_allow_html=True,
-    )
+    st.markdown(_GLOBAL_CSS, unsafe_allow_html=True)
 
 
 def main() -> None: